@@ -1,11 +1,51 @@
-from typing import Optional, Dict, Any
-import json, time, re
-import google.generativeai as genai
-from .config import GEMINI_API_KEY
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
+from contextlib import asynccontextmanager
+import asyncio, json, threading, time, re
+from .config import (
+    GEMINI_API_KEY, AI_MAX_CONCURRENCY, AI_BULKHEAD_WAIT_SECONDS, AI_CALL_TIMEOUT_SECONDS,
+    AI_BREAKER_FAILURES, AI_BREAKER_RESET_SECONDS, AI_HEDGE_PERCENTILE, SUMMARY_TOKEN_BUDGET, SUMMARY_FEEDBACK_CHARS,
+    EVAL_BATCH_ENABLED, EVAL_BATCH_WINDOW_MS, EVAL_BATCH_MAX_ITEMS,
+)
+from .eval_cache import cache_key
+from . import metrics
+from .resilience import (
+    Bulkhead, BulkheadFullError, CircuitBreaker, CircuitOpenError, LatencyWindow, ModelUnavailableError,
+)
 
-DEFAULT_MODEL = "gemini-2.0-flash"   
+DEFAULT_MODEL = "gemini-2.0-flash"
+# Bump whenever the evaluation prompt or its post-processing changes; it is part of the cache key.
+EVAL_PROMPT_VERSION = "eval-v1"
+RUBRIC_KEYS = ["relevance", "star_structure", "technical_depth", "communication"]
 
-genai.configure(api_key=GEMINI_API_KEY)
+_sdk = None
+_sdk_lock = threading.Lock()
+
+
+def _genai():
+    """Import and configure the Gemini SDK on first use; importing it costs about a second."""
+    global _sdk
+    if _sdk is None:
+        with _sdk_lock:
+            if _sdk is None:
+                if not GEMINI_API_KEY:
+                    raise RuntimeError("Missing GEMINI_API_KEY in .env")
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                _sdk = genai
+    return _sdk
+
+# Shared by every client in the process: they all depend on the same upstream.
+model_breaker = CircuitBreaker(AI_BREAKER_FAILURES, AI_BREAKER_RESET_SECONDS)
+model_bulkhead = Bulkhead(AI_MAX_CONCURRENCY, AI_BULKHEAD_WAIT_SECONDS)
+
+
+@metrics.REGISTRY.collector
+def _resilience_metrics():
+    states = (CircuitBreaker.CLOSED, CircuitBreaker.HALF_OPEN, CircuitBreaker.OPEN)
+    yield from metrics.gauge_lines("ai_circuit_state", "Model circuit breaker: 0 closed, 1 half-open, 2 open.",
+                                   [({}, states.index(model_breaker.state))])
+    yield from metrics.gauge_lines("ai_in_flight", "Model calls holding a bulkhead slot.",
+                                   [({}, model_bulkhead.in_flight)])
 
 
 def _clamp(x: float, lo=1.0, hi=5.0) -> float:
@@ -15,18 +55,8 @@ def _clamp(x: float, lo=1.0, hi=5.0) -> float:
         return lo
 
 
-class GeminiClient:
-    def __init__(self, model: str = DEFAULT_MODEL):
-        if not GEMINI_API_KEY:
-            raise RuntimeError("Missing GEMINI_API_KEY in .env")
-        self.model = genai.GenerativeModel(model)
-
-    def generate_text(self, prompt: str) -> str:
-        resp = self.model.generate_content(prompt)
-        return getattr(resp, "text", "").strip()
-
-    def evaluate_answer(self, question: str, user_answer: str, retries: int = 3, backoff: float = 0.8) -> Dict[str, Any]:
-        prompt = f"""You are an Interview Coach. Evaluate the candidate’s answer...
+def _evaluation_prompt(question: str, user_answer: str) -> str:
+    return f"""You are an Interview Coach. Evaluate the candidate’s answer...
 
 Question:
 {question}
@@ -36,61 +66,546 @@ Candidate Answer:
 
 Return JSON only.
 """
-        err = None
-        for i in range(retries):
-            try:
-                resp = self.model.generate_content(prompt)
-                raw = getattr(resp, "text", "").strip()
-                data = self._safe_json(raw)
-                if not data:
-                    raise ValueError("Model did not return valid JSON")
-                data["overall_score"] = _clamp(data.get("overall_score", 3.0))
-                rub = data.get("rubric", {}) or {}
-                data["rubric"] = {
-                    "relevance": _clamp(rub.get("relevance", 3.0)),
-                    "star_structure": _clamp(rub.get("star_structure", 3.0)),
-                    "technical_depth": _clamp(rub.get("technical_depth", 3.0)),
-                    "communication": _clamp(rub.get("communication", 3.0)),
-                }
-                return data
-            except Exception as e:
-                err = e
-                time.sleep(backoff * (2 ** i))
-        return {
-            "feedback": f"AI evaluation error: {err}",
-            "overall_score": 3.0,
-            "rubric": {k: 3.0 for k in ["relevance","star_structure","technical_depth","communication"]}
-        }
 
-    def summarize_session(self, items: list[dict], retries: int = 3, backoff: float = 0.8) -> Dict[str, Any]:
-        serialized = json.dumps(items, ensure_ascii=False, indent=2)
-        prompt = f"""You are an Interview Coach. Summarize this session...
 
-Data:
+def _batch_evaluation_prompt(items: list[tuple[str, str]]) -> str:
+    serialized = json.dumps(
+        [{"id": i, "question": q, "answer": a} for i, (q, a) in enumerate(items)],
+        ensure_ascii=False,
+    )
+    return f"""You are an Interview Coach. Evaluate each candidate’s answer independently...
+
+Items:
 {serialized}
 
-Return JSON only.
+Return JSON only, shaped as {{"results": [{{"id": <item id>, "feedback": "...", "overall_score": 1-5,
+"rubric": {{"relevance": 1-5, "star_structure": 1-5, "technical_depth": 1-5, "communication": 1-5}}}}]}}
+with exactly one result per item.
+"""
+
+
+# ---- session summaries ----
+# Attempts are sent in a compact form: short keys, the rubric as a fixed-order list,
+# and the feedback already stored for the attempt instead of the raw answer. Prompts
+# are packed up to a token budget; a longer session is summarized in parts (in
+# parallel) whose partial summaries are merged the same way.
+CHARS_PER_TOKEN = 4  # rough estimate for English text and compact JSON
+SUMMARY_QUESTION_CHARS = 200
+SUMMARY_SHAPE = '{"summary": "...", "strengths": ["..."], "improvements": ["..."]}'
+_ITEM_LEGEND = ("q = question, s = overall score (1-5), r = [relevance, star_structure, technical_depth, "
+                "communication] (1-5), fb = feedback the candidate already got, a = answer (only when there is no fb)")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _cut(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def _compact(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _compact_item(item: dict, feedback_chars: int = SUMMARY_FEEDBACK_CHARS) -> str:
+    out = {"q": _cut(item.get("question", ""), SUMMARY_QUESTION_CHARS), "s": round(float(item.get("overall_score") or 0), 1)}
+    rubric = item.get("rubric") or {}
+    if rubric:
+        out["r"] = [round(float(rubric.get(k) or 0), 1) for k in RUBRIC_KEYS]
+    if item.get("feedback"):
+        out["fb"] = _cut(item["feedback"], feedback_chars)
+    elif item.get("answer"):
+        out["a"] = _cut(item["answer"], feedback_chars)
+    return _compact(out)
+
+
+def _pack(parts: list[str], budget_tokens: int) -> list[list[str]]:
+    """Group serialized parts, in order, into chunks of at most ``budget_tokens`` (a part never splits)."""
+    chunks: list[list[str]] = [[]]
+    used = 0
+    for part in parts:
+        cost = estimate_tokens(part)
+        if chunks[-1] and used + cost > budget_tokens:
+            chunks.append([])
+            used = 0
+        chunks[-1].append(part)
+        used += cost
+    return chunks
+
+
+def _summary_prompt(items: list[str], part: Optional[Tuple[int, int]] = None) -> str:
+    scope = f"part {part[0]} of {part[1]} of a session" if part else "a session"
+    return f"""You are an Interview Coach. Summarize this session...
+The data below covers {scope}. Item keys: {_ITEM_LEGEND}.
+
+Data:
+[{",".join(items)}]
+
+Return JSON only, shaped as {SUMMARY_SHAPE}.
+"""
+
+
+def _merge_prompt(partials: list[str], part: Optional[Tuple[int, int]] = None) -> str:
+    scope = f"part {part[0]} of {part[1]} of a session" if part else "a whole session"
+    return f"""You are an Interview Coach. Summarize this session from summaries of its consecutive parts.
+Together they cover {scope}. Merge them into one summary; combine repeated points, keep the
+most important strengths and improvements (at most 5 each).
+
+Partial summaries:
+[{",".join(partials)}]
+
+Return JSON only, shaped as {SUMMARY_SHAPE}.
 """
+
+
+def _partial(data: Dict[str, Any]) -> str:
+    return _compact({k: data.get(k) for k in ("summary", "strengths", "improvements")})
+
+
+def _normalize_evaluation(data: Dict[str, Any]) -> Dict[str, Any]:
+    data["overall_score"] = _clamp(data.get("overall_score", 3.0))
+    rub = data.get("rubric", {}) or {}
+    data["rubric"] = {k: _clamp(rub.get(k, 3.0)) for k in RUBRIC_KEYS}
+    return data
+
+
+def _evaluation_fallback(err) -> Dict[str, Any]:
+    """Placeholder when no evaluation could be obtained; never stored as a score.
+
+    ``retry_after`` is set when the call was refused locally (open circuit,
+    full bulkhead) and never reached the model.
+    """
+    data = {
+        "feedback": f"AI evaluation error: {err}",
+        "overall_score": None,
+        "rubric": None,
+        "fallback": True,
+    }
+    if isinstance(err, ModelUnavailableError):
+        data["retry_after"] = err.retry_after
+    return data
+
+
+def _summary_fallback(err) -> Dict[str, Any]:
+    return {"summary": f"AI summary error: {err}", "strengths": [], "improvements": [], "fallback": True}
+
+
+class _FeedbackStream:
+    """Incrementally decodes the ``"feedback"`` string out of partial model JSON."""
+
+    _start = re.compile(r'"feedback"\s*:\s*"')
+    _escapes = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self):
+        self.buf = ""
+        self.pos: Optional[int] = None  # next unread index inside the feedback string
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        self.buf += chunk
+        if self.done:
+            return ""
+        if self.pos is None:
+            m = self._start.search(self.buf)
+            if not m:
+                return ""
+            self.pos = m.end()
+        out = []
+        i, buf = self.pos, self.buf
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch != "\\":
+                out.append(ch)
+                i += 1
+                continue
+            if i + 1 >= len(buf):
+                break  # escape split across chunks
+            esc = buf[i + 1]
+            if esc == "u":
+                if i + 6 > len(buf):
+                    break
+                try:
+                    cp = int(buf[i + 2:i + 6], 16)
+                except ValueError:
+                    i += 6
+                    continue
+                i += 6
+                if 0xD800 <= cp <= 0xDBFF:
+                    # Characters outside the BMP arrive as a \uD8xx\uDCxx pair; join them into one code point.
+                    nxt = buf[i:i + 6]
+                    if len(nxt) < 6 and "\\u".startswith(nxt[:2]):
+                        i -= 6
+                        break  # the low half may still be on its way
+                    try:
+                        low = int(nxt[2:], 16) if nxt.startswith("\\u") else None
+                    except ValueError:
+                        low = None
+                    if low is not None and 0xDC00 <= low <= 0xDFFF:
+                        cp = 0x10000 + ((cp - 0xD800) << 10) + (low - 0xDC00)
+                        i += 6
+                if 0xD800 <= cp <= 0xDFFF:
+                    cp = 0xFFFD  # unpaired surrogate: not encodable, replace it
+                out.append(chr(cp))
+            else:
+                out.append(self._escapes.get(esc, esc))
+                i += 2
+        self.pos = i
+        return "".join(out)
+
+
+def _is_evaluation(entry) -> bool:
+    if not isinstance(entry, dict) or not isinstance(entry.get("rubric"), dict):
+        return False
+    try:
+        float(entry.get("overall_score"))
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class EvaluationBatcher:
+    """Coalesces concurrent evaluations into one structured model request.
+
+    Submissions are collected for ``window_ms`` or until ``max_items`` are
+    pending, then sent as a single prompt; per-item results are fanned back to
+    the waiting callers. Items the model drops or returns malformed are
+    re-evaluated one by one.
+    """
+
+    def __init__(self, client: "GeminiClient", window_ms: int = EVAL_BATCH_WINDOW_MS,
+                 max_items: int = EVAL_BATCH_MAX_ITEMS):
+        self.client = client
+        self.window = window_ms / 1000
+        self.max_items = max_items
+        self._pending: list[tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Future] = set()  # strong refs: the loop only keeps weak ones
+
+    async def submit(self, question: str, user_answer: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((question, user_answer, fut))
+        if len(self._pending) >= self.max_items:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+        return await fut
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def aclose(self):
+        """Send whatever is pending and wait for every in-flight batch."""
+        self._dispatch()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, batch: list[tuple[str, str, asyncio.Future]]):
+        results: Dict[int, Any] = {}
+        if len(batch) > 1:
+            prompt = _batch_evaluation_prompt([(q, a) for q, a, _ in batch])
+            try:
+                data = await self.client._agenerate_json(prompt, retries=1, backoff=0, op="evaluate_batch")
+                for entry in data.get("results") or []:
+                    if isinstance(entry, dict) and isinstance(entry.get("id"), int):
+                        results[entry["id"]] = entry
+            except Exception:
+                results = {}
+
+        async def settle(i: int, question: str, user_answer: str, fut: asyncio.Future):
+            try:
+                entry = results.get(i)
+                if _is_evaluation(entry):
+                    entry = {k: v for k, v in entry.items() if k != "id"}
+                    value = _normalize_evaluation(entry)
+                else:
+                    value = await self.client._aevaluate_model(question, user_answer)
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+                return
+            if not fut.done():
+                fut.set_result(value)
+
+        await asyncio.gather(*(settle(i, q, a, f) for i, (q, a, f) in enumerate(batch)))
+
+
+class GeminiClient:
+    def __init__(self, model: str = DEFAULT_MODEL, cache=None, batching: bool = EVAL_BATCH_ENABLED,
+                 breaker: Optional[CircuitBreaker] = None, bulkhead: Optional[Bulkhead] = None,
+                 call_timeout: float = AI_CALL_TIMEOUT_SECONDS, hedge_percentile: float = AI_HEDGE_PERCENTILE,
+                 summary_budget: int = SUMMARY_TOKEN_BUDGET):
+        self.model_name = model
+        self._model = None  # SDK model object, created on the first call
+        self.cache = cache  # optional EvaluationCache; only successful evaluations are stored
+        self.batcher = EvaluationBatcher(self) if batching else None
+        self.breaker = breaker or model_breaker
+        # Caps in-flight model calls.
+        self.bulkhead = bulkhead or model_bulkhead
+        self.call_timeout = call_timeout
+        self.hedge_percentile = hedge_percentile
+        self.latency = LatencyWindow()
+        self.summary_budget = summary_budget  # estimated tokens of attempt data per summary prompt
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = _genai().GenerativeModel(self.model_name)
+        return self._model
+
+    @staticmethod
+    def _record_call(op: str, prompt: str, started: float, text: Optional[str]):
+        """Metrics for one model call; ``text`` is None when the call failed."""
+        metrics.ai_latency.observe(time.perf_counter() - started, op)
+        metrics.ai_prompt_chars.observe(len(prompt), op)
+        if text is None:
+            metrics.ai_calls.inc(op, "error")
+        else:
+            metrics.ai_calls.inc(op, "ok")
+            metrics.ai_response_chars.observe(len(text), op)
+
+    def _cache_key(self, question: str, user_answer: str) -> str:
+        return cache_key(self.model_name, EVAL_PROMPT_VERSION, question, user_answer)
+
+    def _next_level(self, results: list) -> list[list[str]]:
+        """Partial summaries of one level, packed for the next; raises if every part failed."""
+        partials = [_partial(r) for r in results if not isinstance(r, BaseException)]
+        if not partials:
+            raise results[0]
+        chunks = _pack(partials, self.summary_budget)
+        return chunks if len(chunks) < len(results) else [partials]  # always converge, even on a tiny budget
+
+    # ---- model calls (never block the event loop or the threadpool) ----
+    @asynccontextmanager
+    async def _upstream(self, op: str):
+        """Bulkhead slot plus circuit breaker around one upstream call."""
+        try:
+            await self.bulkhead.acquire()
+        except BulkheadFullError:
+            metrics.ai_rejections.inc(op, "bulkhead_full")
+            raise
+        try:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                metrics.ai_rejections.inc(op, "circuit_open")
+                raise
+            try:
+                yield
+            except Exception:
+                self.breaker.on_failure()
+                raise
+            except BaseException:
+                self.breaker.on_abandoned()
+                raise
+            self.breaker.on_success()
+        finally:
+            self.bulkhead.release()
+
+    async def _call(self, prompt: str) -> str:
+        resp = await asyncio.wait_for(self.model.generate_content_async(prompt), self.call_timeout)
+        return getattr(resp, "text", "").strip()
+
+    async def _hedged_call(self, prompt: str, op: str) -> str:
+        """``_call``, plus a duplicate request if the first one is slower than the hedge percentile."""
+        delay = self.latency.percentile(self.hedge_percentile / 100) if self.hedge_percentile > 0 else None
+        if delay is None:
+            return await self._call(prompt)
+        first = asyncio.ensure_future(self._call(prompt))
+        tasks, hedged = {first}, False
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and await self.bulkhead.try_acquire():
+                hedged = True
+                metrics.ai_hedges.inc(op)
+                tasks.add(asyncio.ensure_future(self._call(prompt)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if not t.cancelled() and t.exception() is None:
+                        return t.result()
+            return first.result()  # every request failed: raise the first one's error
+        finally:
+            for t in tasks:
+                t.cancel()
+            if hedged:
+                self.bulkhead.release()
+
+    async def agenerate_text(self, prompt: str, op: str = "text") -> str:
+        async with self._upstream(op):
+            started = time.perf_counter()
+            try:
+                text = await self._hedged_call(prompt, op)
+            except Exception:
+                self._record_call(op, prompt, started, None)
+                raise
+        self.latency.add(time.perf_counter() - started)
+        self._record_call(op, prompt, started, text)
+        return text
+
+    async def _agenerate_json(self, prompt: str, retries: int, backoff: float, op: str) -> Dict[str, Any]:
         err = None
         for i in range(retries):
+            if i:
+                metrics.ai_retries.inc(op)
             try:
-                resp = self.model.generate_content(prompt)
-                raw = getattr(resp, "text", "").strip()
+                raw = await self.agenerate_text(prompt, op)
                 data = self._safe_json(raw)
                 if not data:
                     raise ValueError("Model did not return valid JSON")
                 return data
+            except ModelUnavailableError:
+                raise  # fail fast; retrying into an open circuit or a full bulkhead only adds load
             except Exception as e:
                 err = e
-                time.sleep(backoff * (2 ** i))
-        return {"summary": f"AI summary error: {err}", "strengths": [], "improvements": []}
+                if i < retries - 1:
+                    await asyncio.sleep(backoff * (2 ** i))
+        raise err
+
+    async def _aevaluate_model(self, question: str, user_answer: str, retries: int = 3, backoff: float = 0.8) -> Dict[str, Any]:
+        data = await self._agenerate_json(_evaluation_prompt(question, user_answer), retries, backoff, "evaluate")
+        return _normalize_evaluation(data)
+
+    async def aevaluate_answer(self, question: str, user_answer: str, retries: int = 3, backoff: float = 0.8) -> Dict[str, Any]:
+        key = self._cache_key(question, user_answer) if self.cache else None
+        if key:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+        try:
+            if self.batcher:
+                data = await self.batcher.submit(question, user_answer)
+            else:
+                data = await self._aevaluate_model(question, user_answer, retries, backoff)
+        except Exception as e:
+            metrics.ai_fallbacks.inc("evaluate")
+            return _evaluation_fallback(e)
+        if key:
+            await self.cache.aput(key, self.model_name, data)
+        return data
+
+    async def astream_evaluation(self, question: str, user_answer: str) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield ``("delta", text)`` as feedback streams in, then ``("result", evaluation)``.
+
+        The final evaluation is parsed and clamped exactly like ``aevaluate_answer``.
+        """
+        key = self._cache_key(question, user_answer) if self.cache else None
+        if key:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                yield "delta", str(cached.get("feedback", ""))
+                yield "result", cached
+                return
+        prompt = _evaluation_prompt(question, user_answer) + 'Put the "feedback" field first.\n'
+        parser = _FeedbackStream()
+        try:
+            async with self._upstream("evaluate_stream"):
+                started = time.perf_counter()
+                deadline = time.monotonic() + self.call_timeout
+                try:
+                    resp = await asyncio.wait_for(
+                        self.model.generate_content_async(prompt, stream=True), self.call_timeout
+                    )
+                    chunks = resp.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - time.monotonic()))
+                        except StopAsyncIteration:
+                            break
+                        delta = parser.feed(getattr(chunk, "text", "") or "")
+                        if delta:
+                            yield "delta", delta
+                except Exception:
+                    self._record_call("evaluate_stream", prompt, started, None)
+                    raise
+                self._record_call("evaluate_stream", prompt, started, parser.buf)
+            data = self._safe_json(parser.buf.strip())
+            if not data:
+                raise ValueError("Model did not return valid JSON")
+        except Exception as e:
+            metrics.ai_fallbacks.inc("evaluate_stream")
+            yield "result", _evaluation_fallback(e)
+            return
+        data = _normalize_evaluation(data)
+        if key:
+            await self.cache.aput(key, self.model_name, data)
+        yield "result", data
+
+    async def asummarize_session(self, items: list[dict], retries: int = 3, backoff: float = 0.8) -> Dict[str, Any]:
+        """Summarize a session within ``summary_budget`` tokens per prompt.
+
+        Parts are summarized concurrently and merged level by level, so latency
+        grows with the number of levels (logarithmic) rather than the number of
+        attempts. A failed part is left out of the merge; the call falls back
+        only if every part of a level fails.
+        """
+        chunks, prompt, op = _pack([_compact_item(i) for i in items], self.summary_budget), _summary_prompt, "summarize"
+        try:
+            while len(chunks) > 1:
+                results = await asyncio.gather(
+                    *(self._agenerate_json(prompt(chunk, (n, len(chunks))), retries, backoff, op)
+                      for n, chunk in enumerate(chunks, start=1)),
+                    return_exceptions=True,
+                )
+                chunks = self._next_level(results)
+                prompt, op = _merge_prompt, "summarize_merge"
+            return await self._agenerate_json(prompt(chunks[0]), retries, backoff, op)
+        except Exception as e:
+            metrics.ai_fallbacks.inc("summarize")
+            return _summary_fallback(e)
 
     @staticmethod
     def _safe_json(text: str):
         try:
-            return json.loads(text)
+            data = json.loads(text)
+            metrics.ai_json_parse.inc("direct")
+            return data
         except Exception:
             m = re.search(r"\{.*\}", text, flags=re.DOTALL)
             if m:
-                return json.loads(m.group(0))
+                try:
+                    data = json.loads(m.group(0))
+                except ValueError:
+                    metrics.ai_json_parse.inc("failed")
+                    raise
+                metrics.ai_json_parse.inc("extracted")
+                return data
+        metrics.ai_json_parse.inc("failed")
         return None
+
+
+_shared_client: Optional[GeminiClient] = None
+
+
+def get_gemini_client() -> GeminiClient:
+    """FastAPI dependency: the process-wide client, built on first use.
+
+    Override it in ``app.dependency_overrides`` to swap the model in tests.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _sdk_lock:
+            if _shared_client is None:
+                from .eval_cache import eval_cache
+                _shared_client = GeminiClient(cache=eval_cache)
+    return _shared_client
+
+
+async def close_gemini_client():
+    """Shutdown hook: let in-flight batched evaluations finish."""
+    if _shared_client is not None and _shared_client.batcher is not None:
+        await _shared_client.batcher.aclose()
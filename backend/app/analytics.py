@@ -0,0 +1,187 @@
+"""Score analytics served from rollup tables.
+
+``record_score`` folds each newly scored attempt into daily ``score_rollups``
+rows (counts and sums) and ``score_histograms`` bins for its scenario,
+question and user, using one upsert per row. Reports sum those day rows into
+the requested buckets in SQL and return one page of subjects at a time, so
+their cost depends on the rows in the window, not on the number of attempts,
+and the response size on the page size. Rollups are history: deleting attempts does not change them.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import date
+
+from fastapi import HTTPException
+from sqlalchemy import Date, and_, cast, func, null, or_, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .ai_service import RUBRIC_KEYS
+from .database import engine
+from .models import Attempt, InterviewScenario, Question, ScoreHistogram, ScoreRollup, User
+from .pagination import decode_cursor
+
+DIMENSIONS = ("scenario", "question", "user")
+GRANULARITIES = ("day", "week", "month", "total")
+PERCENTILES = (("p50", 0.5), ("p90", 0.9))
+
+
+def score_bin(score: float) -> int:
+    return int(round(float(score) * 10))
+
+
+def _upsert_add(session: Session, model, keys: Dict[str, Any], amounts: Dict[str, Any]):
+    """INSERT the row or add ``amounts`` to it in the database (no read-modify-write)."""
+    table = model.__table__
+    dialect = session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(table).values(**keys, **amounts)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={c: table.c[c] + stmt.excluded[c] for c in amounts},
+    )
+    session.connection().execute(stmt)
+
+
+def record_score(session: Session, attempt: Attempt, scenario_id: int, rubric: Optional[Dict[str, float]]):
+    """Add ``attempt``'s score to its scenario/question/user rollups (caller commits)."""
+    day = attempt.created_at.date()
+    amounts: Dict[str, Any] = {"attempt_count": 1, "score_sum": attempt.score, "rubric_count": 0}
+    amounts.update({f"{k}_sum": 0.0 for k in RUBRIC_KEYS})
+    if isinstance(rubric, dict):
+        amounts["rubric_count"] = 1
+        amounts.update({f"{k}_sum": float(rubric.get(k, 0.0)) for k in RUBRIC_KEYS})
+    subjects = {"scenario": scenario_id, "question": attempt.question_id, "user": attempt.user_id}
+    for dimension, subject_id in subjects.items():
+        keys = {"dimension": dimension, "subject_id": subject_id, "day": day}
+        _upsert_add(session, ScoreRollup, keys, amounts)
+        _upsert_add(session, ScoreHistogram, {**keys, "bin": score_bin(attempt.score)}, {"count": 1})
+
+
+# ---------- reports ----------
+def percentile(bins: Dict[int, int], q: float) -> Optional[float]:
+    total = sum(bins.values())
+    if not total:
+        return None
+    seen = 0
+    for b in sorted(bins):
+        seen += bins[b]
+        if seen >= q * total:
+            return b / 10
+    return max(bins) / 10
+
+
+def _window(stmt, model, dimension: str, subject_id: Optional[int], since: Optional[date], until: Optional[date]):
+    stmt = stmt.where(model.dimension == dimension)
+    if subject_id is not None:
+        stmt = stmt.where(model.subject_id == subject_id)
+    if since:
+        stmt = stmt.where(model.day >= since)
+    if until:
+        stmt = stmt.where(model.day <= until)
+    return stmt
+
+
+def _bucket(day, granularity: str):
+    """SQL for the first day of ``day``'s bucket (weeks start on Monday); None for ``total``."""
+    if granularity == "day":
+        return day
+    if granularity == "total":
+        return None
+    if engine.dialect.name == "postgresql":
+        return cast(func.date_trunc(granularity, day), Date)
+    modifiers = ("weekday 0", "-6 days") if granularity == "week" else ("start of month",)  # Monday / 1st
+    return type_coerce(func.date(day, *modifiers), Date)
+
+
+async def _labels(session: AsyncSession, dimension: str, ids: Iterable[int]) -> Dict[int, str]:
+    ids = list(ids)
+    if not ids:
+        return {}
+    model, column = {
+        "scenario": (InterviewScenario, InterviewScenario.title),
+        "question": (Question, Question.text),
+        "user": (User, User.name),
+    }[dimension]
+    rows = (await session.exec(select(model.id, column).where(model.id.in_(ids)))).all()
+    return {i: label for i, label in rows}
+
+
+def _after(cursor: Optional[str], bucket, attempts, subject_id):
+    """HAVING clause for rows after ``cursor`` in (bucket desc, attempts desc, subject_id) order."""
+    b, n, sid = decode_cursor(cursor, 3)
+    later = or_(attempts < n, and_(attempts == n, subject_id > sid))
+    if bucket is None:
+        return later
+    try:
+        b = date.fromisoformat(b)
+    except (TypeError, ValueError):
+        raise HTTPException(400, "Invalid cursor")
+    return or_(bucket < b, and_(bucket == b, later))
+
+
+def cursor_key(row: Dict[str, Any]) -> Tuple:
+    return row["bucket"], row["attempts"], row["subject_id"]
+
+
+async def report(
+    session: AsyncSession,
+    dimension: str,
+    granularity: str = "total",
+    subject_id: Optional[int] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Per-subject, per-bucket aggregates, newest bucket and busiest subject first.
+
+    Sums are grouped in SQL and paged with a keyset ``cursor`` (see
+    ``cursor_key``); up to ``limit + 1`` rows come back so the caller can tell
+    whether there is a next page. Three queries whatever the attempt volume.
+    """
+    sums = ("attempt_count", "score_sum", "rubric_count", *(f"{k}_sum" for k in RUBRIC_KEYS))
+    bucket = _bucket(ScoreRollup.day, granularity)
+    attempts = func.sum(ScoreRollup.attempt_count)
+    group = [ScoreRollup.subject_id] + ([bucket] if bucket is not None else [])
+    stmt = _window(
+        select(ScoreRollup.subject_id, bucket if bucket is not None else null(),
+               *(func.sum(getattr(ScoreRollup, c)) for c in sums)),
+        ScoreRollup, dimension, subject_id, since, until,
+    ).group_by(*group)
+    if cursor:
+        stmt = stmt.having(_after(cursor, bucket, attempts, ScoreRollup.subject_id))
+    order = ([bucket.desc()] if bucket is not None else []) + [attempts.desc(), ScoreRollup.subject_id]
+    rows = (await session.exec(stmt.order_by(*order).limit(limit + 1))).all()
+    if not rows:
+        return []
+
+    ids = {r[0] for r in rows}
+    h_bucket = _bucket(ScoreHistogram.day, granularity)
+    h_group = [ScoreHistogram.subject_id, ScoreHistogram.bin] + ([h_bucket] if h_bucket is not None else [])
+    h_stmt = _window(
+        select(ScoreHistogram.subject_id, h_bucket if h_bucket is not None else null(),
+               ScoreHistogram.bin, func.sum(ScoreHistogram.count)),
+        ScoreHistogram, dimension, subject_id, since, until,
+    ).where(ScoreHistogram.subject_id.in_(ids)).group_by(*h_group)
+    histograms: Dict[Tuple[int, Optional[date]], Dict[int, int]] = {}
+    for sid, b, bin_, count in (await session.exec(h_stmt)).all():
+        histograms.setdefault((sid, b), {})[bin_] = int(count)
+
+    labels = await _labels(session, dimension, ids)
+    out = []
+    for sid, b, *totals in rows:
+        acc = dict(zip(sums, totals))
+        n, rn = int(acc["attempt_count"]), int(acc["rubric_count"])
+        bins = histograms.get((sid, b), {})
+        out.append({
+            "dimension": dimension,
+            "subject_id": sid,
+            "label": labels.get(sid),
+            "bucket": b,
+            "attempts": n,
+            "mean_score": round(acc["score_sum"] / n, 2) if n else None,
+            **{name: percentile(bins, q) for name, q in PERCENTILES},
+            "rubric": {k: round(acc[f"{k}_sum"] / rn, 2) for k in RUBRIC_KEYS} if rn else None,
+        })
+    return out
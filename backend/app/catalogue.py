@@ -0,0 +1,100 @@
+from typing import Awaitable, Callable, Hashable, Optional, Tuple
+from collections import OrderedDict
+import hashlib, threading, time
+
+from fastapi import Request, Response
+
+from .config import CATALOGUE_CACHE_MAX_ENTRIES, CATALOGUE_CACHE_TTL_SECONDS
+
+# Authenticated content: browsers may keep it but must revalidate, shared proxies must not store it.
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag_for(body: bytes) -> str:
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as RFC 9110 asks for ``If-None-Match``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (t.strip() for t in if_none_match.split(","))
+    return etag.removeprefix("W/") in (t.removeprefix("W/") for t in tags)
+
+
+class CatalogueCache:
+    """Serialized scenario/question listings, ready to send as bytes.
+
+    Every write to scenarios or questions calls ``invalidate()``, which bumps
+    the version and drops all entries. A load that started before an
+    invalidation is not stored. Invalidation only reaches this process, so
+    ``ttl`` bounds staleness across workers. The ETag is a hash of the body,
+    so all workers give the same tag for the same content.
+    """
+
+    def __init__(self, ttl_seconds: float = CATALOGUE_CACHE_TTL_SECONDS,
+                 max_entries: int = CATALOGUE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.version = 0
+        # key -> (expires, etag, body); body None means "not found"
+        self._entries: "OrderedDict[Hashable, Tuple[float, str, Optional[bytes]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: Hashable) -> Optional[Tuple[float, str, Optional[bytes]]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def _put(self, key: Hashable, version: int, body: Optional[bytes]) -> Tuple[float, str, Optional[bytes]]:
+        item = (time.monotonic() + self.ttl, etag_for(body or b""), body)
+        if self.ttl <= 0:
+            return item
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = item
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return item
+
+    async def respond(self, request: Request, key: Hashable,
+                      load: Callable[[], Awaitable[Optional[bytes]]]) -> Optional[Response]:
+        """Cached body for ``key`` as a response (304 when the client's ETag matches).
+
+        ``load`` returns the serialized body, or None when the resource does not
+        exist; then this returns None as well and the caller raises its 404.
+        """
+        item = self._get(key)
+        if item is None:
+            version = self.version
+            item = self._put(key, version, await load())
+        _, etag, body = item
+        if body is None:
+            return None
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "version": self.version, "hits": self.hits, "misses": self.misses}
+
+
+catalogue_cache = CatalogueCache()
@@ -0,0 +1,84 @@
+"""Maintenance commands that run against the configured database.
+
+    python -m app.cli import bank.ndjson [--format csv] [--chunk-size 500] [--dry-run]
+    python -m app.cli export attempts [-o attempts.csv.gz] [--since 2025-01-01] [--scenario-id 3] [--user-id 7]
+    python -m app.cli purge --older-than-days 365 [--archive-dir archive/] [--chunk-size 200] [--dry-run]
+"""
+from datetime import datetime
+import argparse, json, sys
+
+from . import exporter, retention
+from .database import engine, init_db
+from .importer import CHUNK_SIZE, FORMATS, detect_format, import_file
+
+
+def _import(args) -> int:
+    init_db()
+    fmt = args.format or detect_format(args.path)
+    with open(args.path, "rb") as f:
+        report = import_file(engine, f, fmt, chunk_size=args.chunk_size, dry_run=args.dry_run)
+    print(report.model_dump_json(indent=2))
+    return 1 if report.error_count else 0
+
+
+def _export(args) -> int:
+    init_db()
+    out = args.output or "-"
+    fmt = args.format or ("csv" if ".csv" in out else "ndjson")
+    gzip = args.gzip or out.endswith(".gz")
+    filters = exporter.ExportFilter(args.since, args.until, args.scenario_id, args.user_id)
+    chunks = exporter.export(engine, args.kind, fmt, filters, gzip, args.batch_size)
+    f = sys.stdout.buffer if out == "-" else open(out, "wb")
+    try:
+        for chunk in chunks:
+            f.write(chunk)
+    finally:
+        if f is not sys.stdout.buffer:
+            f.close()
+    return 0
+
+
+def _purge(args) -> int:
+    init_db()
+    report = retention.purge_expired(engine, args.older_than_days, args.chunk_size, args.archive_dir,
+                                     dry_run=args.dry_run)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.splitlines()[0])
+    sub = p.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="upsert scenarios and questions from NDJSON or CSV")
+    imp.add_argument("path")
+    imp.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    imp.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per transaction")
+    imp.add_argument("--dry-run", action="store_true", help="validate only, write nothing")
+    imp.set_defaults(func=_import)
+
+    exp = sub.add_parser("export", help="stream attempts or sessions to NDJSON or CSV")
+    exp.add_argument("kind", choices=exporter.KINDS)
+    exp.add_argument("-o", "--output", help="file to write (default: stdout); .csv/.gz set the defaults below")
+    exp.add_argument("--format", choices=exporter.FORMATS, help="default: from --output, else ndjson")
+    exp.add_argument("--gzip", action="store_true", help="gzip the output")
+    exp.add_argument("--since", type=datetime.fromisoformat, help="inclusive, e.g. 2025-01-01")
+    exp.add_argument("--until", type=datetime.fromisoformat, help="exclusive")
+    exp.add_argument("--scenario-id", type=int)
+    exp.add_argument("--user-id", type=int)
+    exp.add_argument("--batch-size", type=int, default=exporter.BATCH_SIZE, help="rows fetched per round trip")
+    exp.set_defaults(func=_export)
+
+    pur = sub.add_parser("purge", help="delete sessions (with their attempts) older than a given age")
+    pur.add_argument("--older-than-days", type=int, required=True)
+    pur.add_argument("--archive-dir", help="export what is deleted to gzipped NDJSON here first")
+    pur.add_argument("--chunk-size", type=int, default=retention.RETENTION_CHUNK_SIZE, help="sessions per transaction")
+    pur.add_argument("--dry-run", action="store_true", help="only count what would be deleted")
+    pur.set_defaults(func=_purge)
+
+    args = p.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
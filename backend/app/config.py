@@ -8,3 +8,62 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 APP_NAME = os.getenv("APP_NAME", "AI Interview Coach API")
 APP_ENV = os.getenv("APP_ENV", "development")
+
+# Max in-flight async model calls per worker process (bulkhead) and how long a call
+# may wait for a free slot before failing fast
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+AI_BULKHEAD_WAIT_SECONDS = float(os.getenv("AI_BULKHEAD_WAIT_SECONDS", "5"))
+# Deadline for a single model call (a streamed evaluation must finish within it too)
+AI_CALL_TIMEOUT_SECONDS = float(os.getenv("AI_CALL_TIMEOUT_SECONDS", "30"))
+# Circuit breaker: open after N consecutive upstream failures, probe again after the reset delay (0 disables)
+AI_BREAKER_FAILURES = int(os.getenv("AI_BREAKER_FAILURES", "5"))
+AI_BREAKER_RESET_SECONDS = float(os.getenv("AI_BREAKER_RESET_SECONDS", "30"))
+# Send a second, hedged request when a call is slower than this latency percentile (0 disables)
+AI_HEDGE_PERCENTILE = float(os.getenv("AI_HEDGE_PERCENTILE", "0"))
+# Session summaries: estimated tokens of attempt data per prompt; longer sessions are summarized in parts
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "3000"))
+SUMMARY_FEEDBACK_CHARS = int(os.getenv("SUMMARY_FEEDBACK_CHARS", "400"))  # per attempt, stored feedback is cut here
+
+# Evaluation cache (in-process LRU in front of a shared DB tier)
+EVAL_CACHE_ENABLED = os.getenv("EVAL_CACHE_ENABLED", "true").lower() == "true"
+EVAL_CACHE_MAX_ENTRIES = int(os.getenv("EVAL_CACHE_MAX_ENTRIES", "2048"))
+EVAL_CACHE_TTL_SECONDS = int(os.getenv("EVAL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Background evaluation queue (DB-backed; 0 workers disables the in-process pool)
+EVAL_QUEUE_WORKERS = int(os.getenv("EVAL_QUEUE_WORKERS", "4"))
+EVAL_QUEUE_POLL_SECONDS = float(os.getenv("EVAL_QUEUE_POLL_SECONDS", "1.0"))
+EVAL_QUEUE_MAX_TRIES = int(os.getenv("EVAL_QUEUE_MAX_TRIES", "3"))
+EVAL_QUEUE_LEASE_SECONDS = int(os.getenv("EVAL_QUEUE_LEASE_SECONDS", "300"))
+
+# Micro-batching: coalesce concurrent evaluations into one model request
+EVAL_BATCH_ENABLED = os.getenv("EVAL_BATCH_ENABLED", "false").lower() == "true"
+EVAL_BATCH_WINDOW_MS = int(os.getenv("EVAL_BATCH_WINDOW_MS", "50"))
+EVAL_BATCH_MAX_ITEMS = int(os.getenv("EVAL_BATCH_MAX_ITEMS", "8"))
+
+# Rate limiting: "memory" (per worker) or "db" (shared across workers)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "db")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+RATE_LIMIT_AI = os.getenv("RATE_LIMIT_AI", "10/60")  # requests/seconds per user
+
+# Authenticated-user cache (per worker); TTL bounds staleness across workers
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+# Let read-only routes trust the signed token claims without any lookup
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
+
+# Scenario/question listing cache (per worker); TTL bounds staleness across workers
+CATALOGUE_CACHE_TTL_SECONDS = float(os.getenv("CATALOGUE_CACHE_TTL_SECONDS", "300"))
+CATALOGUE_CACHE_MAX_ENTRIES = int(os.getenv("CATALOGUE_CACHE_MAX_ENTRIES", "1024"))
+
+# Retention purge of old sessions/attempts; 0 days disables the background job
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "0"))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+RETENTION_CHUNK_SIZE = int(os.getenv("RETENTION_CHUNK_SIZE", "200"))  # sessions per transaction
+RETENTION_PAUSE_SECONDS = float(os.getenv("RETENTION_PAUSE_SECONDS", "0.1"))  # between chunks
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR") or None  # gzipped NDJSON written before deleting
+
+# Weight of the newest attempt in the skill-profile moving averages behind /me/progress trends
+SKILL_TREND_ALPHA = float(os.getenv("SKILL_TREND_ALPHA", "0.3"))
+
+# Prometheus-text /metrics endpoint and the HTTP/model-call instrumentation behind it
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
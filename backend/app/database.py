@@ -1,13 +1,207 @@
+from typing import Any, Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 import os
 
-DB_URL = os.getenv("DB_URL", "sqlite:///./app.db")
-connect_args = {"check_same_thread": False} if DB_URL.startswith("sqlite") else {}
-engine = create_engine(DB_URL, echo=False, connect_args=connect_args)
+DB_URL = os.getenv("DB_URL") or os.getenv("DATABASE_URL") or "sqlite:///./app.db"
+# Request handlers use an AsyncSession (aiosqlite/asyncpg); false falls back to the sync
+# driver with each call run in the threadpool. Migrations and background workers always
+# use the sync engine.
+DB_ASYNC = os.getenv("DB_ASYNC", "true").lower() == "true"
+
+# ---- Engine profiles (see backend/README.md for sizing) ----
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))       # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))       # seconds before a connection is replaced
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))  # Postgres only; 0 disables
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def _sqlite_pragmas(eng, in_memory: bool):
+    @event.listens_for(eng, "connect")
+    def _pragmas(dbapi_conn, _):
+        cur = dbapi_conn.cursor()
+        if not in_memory:
+            # WAL lets readers proceed during a write; NORMAL is durable in WAL mode except on power loss
+            cur.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+            cur.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cur.execute("PRAGMA foreign_keys=ON")
+        cur.close()
+
+
+def _is_memory(url: str) -> bool:
+    return url.split("://", 1)[-1] in ("", "/:memory:")
+
+
+def _sqlite_engine(url: str):
+    in_memory = _is_memory(url)
+    kwargs = {} if in_memory else {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    eng = create_engine(
+        url, echo=False, connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        **kwargs,
+    )
+    _sqlite_pragmas(eng, in_memory)
+    return eng
+
+
+def _server_engine(url: str):
+    connect_args = {}
+    if url.startswith("postgresql") and DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return create_engine(
+        url, echo=False, connect_args=connect_args,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+engine = _sqlite_engine(DB_URL) if DB_URL.startswith("sqlite") else _server_engine(DB_URL)
+
+
+def _async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+def _async_engine(url: str) -> AsyncEngine:
+    aurl = _async_url(url)
+    if aurl.startswith("sqlite"):
+        in_memory = _is_memory(url)
+        kwargs = {} if in_memory else {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        }
+        eng = create_async_engine(aurl, echo=False, connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}, **kwargs)
+        _sqlite_pragmas(eng.sync_engine, in_memory)
+        return eng
+    connect_args = {}
+    if aurl.startswith("postgresql") and DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    return create_async_engine(
+        aurl, echo=False, connect_args=connect_args,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+async_engine: Optional[AsyncEngine] = _async_engine(DB_URL) if DB_ASYNC else None
+
+
+def _pool_stats(pool) -> dict:
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            stats[name] = fn()
+    stats["max_overflow"] = getattr(pool, "_max_overflow", None)
+    return stats
+
+
+def pool_status() -> dict:
+    stats = {"sync": _pool_stats(engine.pool)}
+    if async_engine is not None:
+        stats["async"] = _pool_stats(async_engine.sync_engine.pool)
+    return stats
+
 
 def init_db():
-    SQLModel.metadata.create_all(engine)
+    from . import models  # noqa: F401  (registers every table on SQLModel.metadata)
+    from .migrations import run_migrations
+    run_migrations(engine, SQLModel.metadata)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+class SyncSessionAdapter:
+    """AsyncSession-shaped wrapper over a sync ``Session`` (used when ``DB_ASYNC=false``).
+
+    Each call that may hit the database runs in the threadpool, so handlers are
+    written once against the async API.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, obj):
+        self.sync_session.add(obj)
+
+    def add_all(self, objs):
+        self.sync_session.add_all(objs)
+
+    async def exec(self, statement, **kw):
+        return await run_in_threadpool(self.sync_session.exec, statement, **kw)
+
+    async def execute(self, statement, params=None, **kw):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kw)
+
+    async def get(self, model, ident, **kw):
+        return await run_in_threadpool(self.sync_session.get, model, ident, **kw)
+
+    async def delete(self, obj):
+        await run_in_threadpool(self.sync_session.delete, obj)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, obj, **kw):
+        await run_in_threadpool(self.sync_session.refresh, obj, **kw)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn: Callable[..., Any], *args, **kw):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kw)
+
+
+async def get_db():
+    """Request-scoped database session with the ``AsyncSession`` API.
+
+    Objects are not expired on commit, so attributes stay readable without
+    implicit (blocking) reloads; refresh explicitly when needed.
+    """
+    if async_engine is not None:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+    else:
+        with Session(engine, expire_on_commit=False) as session:
+            yield SyncSessionAdapter(session)
+
+
+async def release_connection(session):
+    """Return the session's connection to the pool before awaiting slow I/O.
+
+    Loaded objects stay usable (detached); ``session.add`` re-attaches them
+    afterwards. Only call this with nothing left to flush.
+    """
+    await session.close()
@@ -1,54 +1,131 @@
+from typing import Optional
+from collections import OrderedDict
+import threading, time
+
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .database import get_session
+from .config import AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_ENTRIES, AUTH_TRUST_TOKEN_CLAIMS
+from .database import get_db
 from .models import User
-from .security import decode_token  
+from .security import decode_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+_PRINCIPAL_FIELDS = ("id", "name", "email", "role")  # the password hash is never cached
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
-) -> User:
-    payload = decode_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = session.exec(select(User).where(User.id == payload.get("sub"))).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+class PrincipalCache:
+    """Short-lived, size-bounded cache of authenticated users keyed by token subject.
 
-    return user
+    Entries are plain snapshots; callers get a fresh detached ``User`` each time.
+    Invalidation is per process, so ``ttl`` bounds staleness across workers.
+    """
 
+    def __init__(self, ttl_seconds: float = AUTH_CACHE_TTL_SECONDS, max_entries: int = AUTH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
-    if user.role != "admin":
-        raise HTTPException(status_code=403, detail="Admin required")
-    return user
+    def get(self, key: str) -> Optional[User]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, snapshot = item
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return User(**snapshot, password_hash="")
+
+    def put(self, key: str, user: User):
+        if self.ttl <= 0:
+            return
+        snapshot = {f: getattr(user, f) for f in _PRINCIPAL_FIELDS}
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: Optional[int] = None, email: Optional[str] = None):
+        with self._lock:
+            for key in [k for k, (_, snap) in self._entries.items()
+                        if snap["id"] == user_id or (email and snap["email"] == email)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
-def get_current_user(
+
+principal_cache = PrincipalCache()
+
+
+def _subject_key(payload: dict) -> Optional[str]:
+    if payload.get("sub"):
+        return f"id:{payload['sub']}"
+    if payload.get("email"):
+        return f"email:{payload['email']}"
+    return None
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_db)
 ) -> User:
     payload = decode_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid token")
 
- 
+    key = _subject_key(payload)
+    cached = principal_cache.get(key) if key else None
+    if cached is not None:
+        return cached
+
     user_id = payload.get("sub")
     email = payload.get("email")
 
     user = None
     if user_id:
-        user = session.get(User, user_id)
+        try:
+            user = await session.get(User, int(user_id))
+        except (TypeError, ValueError):
+            user = None
     elif email:
-        user = session.exec(select(User).where(User.email == email)).first()
+        user = (await session.exec(select(User).where(User.email == email))).first()
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
+    principal_cache.put(key, user)
     return user
 
+
+async def get_read_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_db)
+) -> User:
+    """Principal for read-only routes.
+
+    With ``AUTH_TRUST_TOKEN_CLAIMS`` the signed claims are used as-is (no DB or
+    cache lookup), so a role change only applies once the token is reissued.
+    """
+    if AUTH_TRUST_TOKEN_CLAIMS:
+        payload = decode_token(token)
+        if not payload:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        if payload.get("sub") and payload.get("role"):
+            return User(id=int(payload["sub"]), name=payload.get("name", ""), email=payload.get("email", ""),
+                        role=payload["role"], password_hash="")
+    return await get_current_user(token, session)
+
+
+def require_admin(user: User = Depends(get_current_user)) -> User:
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin required")
+    return user
@@ -0,0 +1,156 @@
+from typing import Optional, Dict, Any
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import asyncio, hashlib, json, re, threading, time, unicodedata
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from .config import EVAL_CACHE_ENABLED, EVAL_CACHE_MAX_ENTRIES, EVAL_CACHE_TTL_SECONDS
+from .database import engine
+from .models import EvaluationCacheEntry
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def cache_key(model: str, prompt_version: str, question: str, answer: str) -> str:
+    raw = "\x1f".join([model, prompt_version, normalize_text(question), normalize_text(answer)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """Two-tier cache for answer evaluations.
+
+    The in-process tier is an LRU bounded by entry count and TTL; the DB tier
+    (``evaluation_cache`` table) survives restarts and is shared by workers.
+    Every ``purge_every`` DB writes, expired rows are deleted in one statement.
+    """
+
+    def __init__(self, max_entries: int = EVAL_CACHE_MAX_ENTRIES, ttl_seconds: int = EVAL_CACHE_TTL_SECONDS,
+                 persistent: bool = True, db_engine=engine, purge_every: int = 1000):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.persistent = persistent
+        self.engine = db_engine
+        self.purge_every = purge_every
+        self._writes = 0
+        self._entries: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "db": 0}
+        self.misses = 0
+
+    # ---- memory tier ----
+    def _mem_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, data = item
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def _mem_put(self, key: str, data: Dict[str, Any], stored_at: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (stored_at or time.time(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ---- DB tier ----
+    def _db_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with Session(self.engine) as session:
+            row = session.get(EvaluationCacheEntry, key)
+            if row is None:
+                return None
+            if row.created_at < datetime.utcnow() - timedelta(seconds=self.ttl):
+                session.delete(row)
+                session.commit()
+                return None
+            data = json.loads(row.payload)
+            stored_at = row.created_at.timestamp()
+        self._mem_put(key, data, stored_at)
+        return data
+
+    def _db_put(self, key: str, model: str, data: Dict[str, Any]):
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self._purge()
+        payload = json.dumps(data, ensure_ascii=False)
+        with Session(self.engine) as session:
+            row = session.get(EvaluationCacheEntry, key)
+            if row is None:
+                row = EvaluationCacheEntry(key=key, model=model, payload=payload)
+            else:
+                row.payload = payload
+                row.created_at = datetime.utcnow()
+            session.add(row)
+            try:
+                session.commit()
+            except IntegrityError:
+                # another worker stored the same key first
+                session.rollback()
+
+    def _purge(self):
+        """Drop rows older than the TTL; reads already ignore them, this keeps the table bounded."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        with self.engine.begin() as conn:
+            conn.execute(delete(EvaluationCacheEntry).where(EvaluationCacheEntry.created_at < cutoff))
+
+    def _count(self, tier: Optional[str]):
+        with self._lock:  # stats() may read them from another thread
+            if tier is None:
+                self.misses += 1
+            else:
+                self.hits[tier] += 1
+
+    # ---- public API ----
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self._mem_get(key)
+        if data is not None:
+            self._count("memory")
+            return dict(data)
+        if self.persistent:
+            data = await asyncio.to_thread(self._db_get, key)
+            if data is not None:
+                self._count("db")
+                return dict(data)
+        self._count(None)
+        return None
+
+    async def aput(self, key: str, model: str, data: Dict[str, Any]):
+        self._mem_put(key, dict(data))
+        if self.persistent:
+            await asyncio.to_thread(self._db_put, key, model, data)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            memory_hits, db_hits, misses, entries = self.hits["memory"], self.hits["db"], self.misses, len(self._entries)
+        hits = memory_hits + db_hits
+        total = hits + misses
+        return {
+            "enabled": True,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "memory_hits": memory_hits,
+            "db_hits": db_hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
+
+
+eval_cache: Optional[EvaluationCache] = EvaluationCache() if EVAL_CACHE_ENABLED else None
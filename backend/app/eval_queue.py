@@ -0,0 +1,153 @@
+"""DB-backed queue that evaluates answers outside the request cycle.
+
+Jobs live in the ``evaluation_jobs`` table, so anything queued survives a
+restart. Workers claim a job with a conditional UPDATE, which keeps several
+uvicorn processes from evaluating the same attempt. A job stuck in
+``running`` longer than the lease (e.g. its worker died) is claimed again.
+Only calls that reached the model count as tries: a job refused locally by
+the circuit breaker or the bulkhead goes back to the queue until the breaker
+lets calls through again.
+"""
+from typing import Optional
+from datetime import datetime, timedelta
+import asyncio, logging
+
+from sqlalchemy import or_, and_, update
+from sqlmodel import Session, select
+
+from .config import EVAL_QUEUE_WORKERS, EVAL_QUEUE_POLL_SECONDS, EVAL_QUEUE_MAX_TRIES, EVAL_QUEUE_LEASE_SECONDS
+from .database import engine
+from .models import Attempt, EvaluationJob, Question
+from .scoring import record_evaluation
+
+log = logging.getLogger(__name__)
+
+
+class EvaluationQueue:
+    def __init__(self, workers: int = EVAL_QUEUE_WORKERS, poll_interval: float = EVAL_QUEUE_POLL_SECONDS,
+                 max_tries: int = EVAL_QUEUE_MAX_TRIES, lease_seconds: int = EVAL_QUEUE_LEASE_SECONDS):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_tries = max_tries
+        self.lease = timedelta(seconds=lease_seconds)
+        self.client_provider = None
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    # ---- producer side ----
+    def enqueue(self, session: Session, attempt: Attempt) -> EvaluationJob:
+        """Add a job for ``attempt`` to the caller's transaction."""
+        job = EvaluationJob(attempt_id=attempt.id)
+        session.add(job)
+        return job
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ---- lifecycle ----
+    def start(self, client_provider):
+        """Start the workers; ``client_provider()`` returns the model client when a job needs it."""
+        self.client_provider = client_provider
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---- consumer side ----
+    def _claim(self) -> Optional[tuple[int, int, str, str]]:
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(EvaluationJob.status == "queued", EvaluationJob.available_at <= now),
+            and_(EvaluationJob.status == "running", EvaluationJob.locked_at < now - self.lease),
+        )
+        with Session(engine) as session:
+            # Snapshot (id, status, locked_at): the UPDATE only wins if the row is unchanged.
+            candidates = session.exec(
+                select(EvaluationJob.id, EvaluationJob.status, EvaluationJob.locked_at)
+                .where(claimable).order_by(EvaluationJob.id).limit(5)
+            ).all()
+            for job_id, status, locked_at in candidates:
+                res = session.execute(
+                    update(EvaluationJob)
+                    .where(EvaluationJob.id == job_id, EvaluationJob.status == status,
+                           EvaluationJob.locked_at == locked_at)
+                    .values(status="running", locked_at=now, tries=EvaluationJob.tries + 1)
+                )
+                session.commit()
+                if res.rowcount != 1:
+                    continue  # another worker got it first
+                job = session.get(EvaluationJob, job_id)
+                attempt = session.get(Attempt, job.attempt_id)
+                question = session.get(Question, attempt.question_id) if attempt else None
+                if not attempt or not question:
+                    self._finish(job_id, None, "Attempt or question no longer exists")
+                    continue
+                return job_id, attempt.id, question.text, attempt.user_answer
+        return None
+
+    def _finish(self, job_id: int, data: Optional[dict], error: Optional[str] = None,
+                retry_after: Optional[float] = None):
+        with Session(engine) as session:
+            job = session.get(EvaluationJob, job_id)
+            if job is None:
+                return
+            attempt = session.get(Attempt, job.attempt_id)
+            if data is not None and attempt is not None:
+                record_evaluation(session, attempt, data)
+                job.status = "done"
+                job.last_error = None
+            elif retry_after is not None and attempt is not None:
+                # Refused before reaching the model: give the claim's try back and wait for the breaker.
+                job.status = "queued"
+                job.tries = max(0, job.tries - 1)
+                job.last_error = error
+                job.available_at = datetime.utcnow() + timedelta(seconds=retry_after)
+            elif job.tries >= self.max_tries or attempt is None:
+                job.status = "failed"
+                job.last_error = error
+                if attempt is not None:
+                    attempt.status = "failed"
+                    session.add(attempt)
+            else:
+                job.status = "queued"
+                job.last_error = error
+                job.available_at = datetime.utcnow() + timedelta(seconds=2 ** job.tries)
+            job.locked_at = None
+            session.add(job)
+            session.commit()
+
+    async def _worker(self):
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self._claim)
+            except Exception:
+                log.exception("Could not claim evaluation job")
+                claimed = None
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            job_id, _, question, answer = claimed
+            try:
+                data = await self.client_provider().aevaluate_answer(question, answer)
+                if data.get("fallback"):
+                    # Upstream unavailable: retry later instead of storing a placeholder.
+                    await asyncio.to_thread(self._finish, job_id, None, data.get("feedback"), data.get("retry_after"))
+                else:
+                    await asyncio.to_thread(self._finish, job_id, data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception("Evaluation job %s failed", job_id)
+                await asyncio.to_thread(self._finish, job_id, None, str(e))
+
+
+evaluation_queue = EvaluationQueue()
@@ -0,0 +1,161 @@
+"""Streaming export of attempts and sessions as NDJSON or CSV, optionally gzipped.
+
+Rows come from one query per export, read through a server-side cursor
+(``stream_results``) in batches of ``batch_size``. Each batch is encoded and
+handed on before the next one is fetched, so memory use depends on the batch
+size and not on the export size. Attempts carry their question, scenario and
+user, the rubric columns, and the ``feedback`` text decoded from ``ai_feedback``.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+import csv, io, json, zlib
+
+from sqlalchemy import select
+
+from .models import Attempt, InterviewScenario, InterviewSession, Question, SessionSummary, User
+
+KINDS = ("attempts", "sessions")
+FORMATS = ("ndjson", "csv")
+BATCH_SIZE = 1000
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+ATTEMPT_FIELDS = [
+    "id", "session_id", "user_id", "user_email", "scenario_id", "scenario_title", "question_id",
+    "question_text", "difficulty", "status", "score", "relevance", "star_structure", "technical_depth",
+    "communication", "feedback", "user_answer", "created_at",
+]
+SESSION_FIELDS = [
+    "id", "user_id", "user_email", "scenario_id", "scenario_title", "status", "started_at", "ended_at",
+    "scored_count", "average_score",
+]
+
+
+@dataclass
+class ExportFilter:
+    since: Optional[datetime] = None   # inclusive
+    until: Optional[datetime] = None   # exclusive
+    scenario_id: Optional[int] = None
+    user_id: Optional[int] = None
+    session_started_before: Optional[datetime] = None  # whole sessions, as the retention purge deletes them
+
+
+def _attempts_query(f: ExportFilter):
+    stmt = (
+        select(
+            Attempt.id, Attempt.session_id, Attempt.user_id, User.email.label("user_email"),
+            InterviewSession.scenario_id, InterviewScenario.title.label("scenario_title"),
+            Attempt.question_id, Question.text.label("question_text"), Question.difficulty,
+            Attempt.status, Attempt.score, Attempt.relevance, Attempt.star_structure,
+            Attempt.technical_depth, Attempt.communication, Attempt.ai_feedback,
+            Attempt.user_answer, Attempt.created_at,
+        )
+        .join(InterviewSession, InterviewSession.id == Attempt.session_id)
+        .join(User, User.id == Attempt.user_id, isouter=True)
+        .join(Question, Question.id == Attempt.question_id, isouter=True)
+        .join(InterviewScenario, InterviewScenario.id == InterviewSession.scenario_id, isouter=True)
+        .order_by(Attempt.id)
+    )
+    if f.since:
+        stmt = stmt.where(Attempt.created_at >= f.since)
+    if f.until:
+        stmt = stmt.where(Attempt.created_at < f.until)
+    if f.scenario_id:
+        stmt = stmt.where(InterviewSession.scenario_id == f.scenario_id)
+    if f.user_id:
+        stmt = stmt.where(Attempt.user_id == f.user_id)
+    if f.session_started_before:
+        stmt = stmt.where(InterviewSession.started_at < f.session_started_before)
+    return stmt
+
+
+def _sessions_query(f: ExportFilter):
+    stmt = (
+        select(
+            InterviewSession.id, InterviewSession.user_id, User.email.label("user_email"),
+            InterviewSession.scenario_id, InterviewScenario.title.label("scenario_title"),
+            InterviewSession.status, InterviewSession.started_at, InterviewSession.ended_at,
+            SessionSummary.scored_count, SessionSummary.score_sum,
+        )
+        .join(User, User.id == InterviewSession.user_id, isouter=True)
+        .join(InterviewScenario, InterviewScenario.id == InterviewSession.scenario_id, isouter=True)
+        .join(SessionSummary, SessionSummary.session_id == InterviewSession.id, isouter=True)
+        .order_by(InterviewSession.id)
+    )
+    if f.since:
+        stmt = stmt.where(InterviewSession.started_at >= f.since)
+    if f.until:
+        stmt = stmt.where(InterviewSession.started_at < f.until)
+    if f.scenario_id:
+        stmt = stmt.where(InterviewSession.scenario_id == f.scenario_id)
+    if f.user_id:
+        stmt = stmt.where(InterviewSession.user_id == f.user_id)
+    if f.session_started_before:
+        stmt = stmt.where(InterviewSession.started_at < f.session_started_before)
+    return stmt
+
+
+def _attempt_row(m) -> Dict[str, Any]:
+    row = {k: m[k] for k in ATTEMPT_FIELDS if k != "feedback"}
+    try:
+        row["feedback"] = (json.loads(m["ai_feedback"]) or {}).get("feedback") if m["ai_feedback"] else None
+    except (ValueError, AttributeError):
+        row["feedback"] = None
+    return row
+
+
+def _session_row(m) -> Dict[str, Any]:
+    row = {k: m[k] for k in SESSION_FIELDS if k not in ("scored_count", "average_score")}
+    n = m["scored_count"] or 0
+    row["scored_count"] = n
+    row["average_score"] = round(m["score_sum"] / n, 2) if n else None
+    return row
+
+
+def iter_batches(engine, kind: str, filters: ExportFilter, batch_size: int = BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of at most ``batch_size`` export rows, oldest id first."""
+    stmt, to_row = (_attempts_query, _attempt_row) if kind == "attempts" else (_sessions_query, _session_row)
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt(filters))
+        for part in result.mappings().partitions():
+            yield [to_row(m) for m in part]
+
+
+def _value(v: Any) -> Any:
+    return v.isoformat() if isinstance(v, datetime) else v
+
+
+def encode(batches: Iterator[List[Dict[str, Any]]], fmt: str, fields: List[str], gzip: bool = False) -> Iterator[bytes]:
+    """Serialize ``batches`` to NDJSON or CSV (header first), one bytes chunk per batch."""
+    packer = zlib.compressobj(wbits=31) if gzip else None  # wbits=31: gzip container
+
+    def out(data: bytes) -> bytes:
+        return packer.compress(data) if packer else data
+
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(fields)
+        for batch in batches:
+            writer.writerows([[_value(r[k]) for k in fields] for r in batch])
+            yield out(buf.getvalue().encode("utf-8"))
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield out(buf.getvalue().encode("utf-8"))
+    else:
+        for batch in batches:
+            lines = "".join(json.dumps({k: _value(r[k]) for k in fields}, ensure_ascii=False) + "\n" for r in batch)
+            yield out(lines.encode("utf-8"))
+    if packer:
+        yield packer.flush()
+
+
+def export(engine, kind: str, fmt: str, filters: ExportFilter, gzip: bool = False,
+           batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    fields = ATTEMPT_FIELDS if kind == "attempts" else SESSION_FIELDS
+    return encode(iter_batches(engine, kind, filters, batch_size), fmt, fields, gzip)
+
+
+def filename(kind: str, fmt: str, gzip: bool) -> str:
+    return f"{kind}.{fmt}" + (".gz" if gzip else "")
@@ -0,0 +1,216 @@
+"""Bulk import of scenarios and questions from NDJSON or CSV.
+
+One row describes one question and its scenario; a row without ``question``
+only creates or updates the scenario::
+
+    {"scenario": "Backend Engineer Interview", "role": "Backend", "level": "Junior",
+     "description": "APIs and databases", "question": "Explain REST vs. GraphQL.", "difficulty": "medium"}
+
+CSV files use the same column names. Rows are matched on a natural key:
+scenario ``title`` and question ``(scenario, text)``. Re-importing a file
+therefore changes nothing, and only changed fields are updated. Both keys are
+unique indexes and rows are written with ``INSERT ... ON CONFLICT DO UPDATE``,
+so concurrent imports of the same content cannot create duplicates. Input is
+read as a stream and written in chunks of ``chunk_size`` rows. Each chunk is
+one transaction with a fixed number of statements: three lookups, one
+scenario upsert per set of supplied fields and one question upsert. Memory
+stays flat however big the file is.
+"""
+from typing import Any, Dict, IO, Iterator, List, Literal, Optional, Tuple
+import csv, io, json
+
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import or_, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from .catalogue import catalogue_cache
+from .models import InterviewScenario, Question
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+FORMATS = ("ndjson", "csv")
+
+
+class ImportRow(BaseModel):
+    scenario: str = Field(..., min_length=1, max_length=200)
+    role: Optional[str] = Field(None, max_length=100)
+    level: Optional[str] = Field(None, max_length=50)
+    description: Optional[str] = None
+    question: Optional[str] = Field(None, max_length=4000)
+    difficulty: Literal["easy", "medium", "hard"] = "medium"
+
+
+class ImportReport(BaseModel):
+    rows: int = 0
+    scenarios_created: int = 0
+    scenarios_updated: int = 0
+    questions_created: int = 0
+    questions_updated: int = 0
+    questions_unchanged: int = 0
+    error_count: int = 0
+    errors: List[Dict[str, Any]] = []  # first MAX_REPORTED_ERRORS: {"line": n, "error": "..."}
+
+    def error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+
+def detect_format(name: Optional[str], content_type: Optional[str] = None) -> str:
+    name, content_type = (name or "").lower(), (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    return "ndjson"
+
+
+def _clean(raw: Dict[str, Any]) -> Dict[str, Any]:
+    # CSV gives "" for empty cells; treat them like missing keys
+    return {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in raw.items()
+            if k and v not in ("", None)}
+
+
+def iter_rows(text: IO[str], fmt: str) -> Iterator[Tuple[int, Optional[ImportRow], Optional[str]]]:
+    """Yield ``(line, row, error)`` for each record; exactly one of row/error is set."""
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for raw in reader:
+            yield _validated(reader.line_num, raw)
+        return
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(raw, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield _validated(line_no, raw)
+
+
+def _validated(line_no: int, raw: Dict[str, Any]) -> Tuple[int, Optional[ImportRow], Optional[str]]:
+    try:
+        return line_no, ImportRow(**_clean(raw)), None
+    except ValidationError as e:
+        msg = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+        return line_no, None, msg
+
+
+def _insert(session: Session, table):
+    dialect = session.get_bind().dialect.name
+    return (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+
+
+def _upsert_chunk(session: Session, rows: List[ImportRow]) -> Dict[str, int]:
+    """Write one chunk; returns the counts to add to the report once it is committed."""
+    counts = dict.fromkeys(("scenarios_created", "scenarios_updated", "questions_created",
+                            "questions_updated", "questions_unchanged"), 0)
+    # ---- scenarios, keyed by title (last row wins within a chunk) ----
+    wanted: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        fields = wanted.setdefault(r.scenario, {})
+        fields.update({k: v for k, v in (("role", r.role), ("level", r.level), ("description", r.description))
+                       if v is not None})
+    existing = {s.title: s for s in session.exec(
+        select(InterviewScenario).where(InterviewScenario.title.in_(list(wanted)))
+    ).all()}
+
+    pending = {t: f for t, f in wanted.items()
+               if t not in existing or any(getattr(existing[t], k) != v for k, v in f.items())}
+    counts["scenarios_created"] = sum(t not in existing for t in pending)
+    counts["scenarios_updated"] = len(pending) - counts["scenarios_created"]
+
+    # One upsert per set of supplied fields. A title another import created meanwhile
+    # gets those fields; its other columns keep their values.
+    table = InterviewScenario.__table__
+    for cols in {tuple(sorted(f)) for f in pending.values()}:
+        stmt = _insert(session, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["title"],
+            set_={k: stmt.excluded[k] for k in cols},
+            where=or_(*(table.c[k].is_distinct_from(stmt.excluded[k]) for k in cols)),
+        ) if cols else stmt.on_conflict_do_nothing(index_elements=["title"])
+        session.connection().execute(stmt, [
+            {"title": t, "role": "", "level": "", "description": "", **f}
+            for t, f in pending.items() if tuple(sorted(f)) == cols
+        ])
+    ids = dict(session.exec(
+        select(InterviewScenario.title, InterviewScenario.id).where(InterviewScenario.title.in_(list(wanted)))
+    ).all())
+
+    # ---- questions, keyed by (scenario_id, text) ----
+    questions: Dict[Tuple[int, str], str] = {}
+    for r in rows:
+        if r.question:
+            questions[(ids[r.scenario], r.question)] = r.difficulty
+    if not questions:
+        return counts
+    current = {(q.scenario_id, q.text): q for q in session.exec(
+        select(Question).where(tuple_(Question.scenario_id, Question.text).in_(list(questions)))
+    ).all()}
+
+    new_q = [k for k in questions if k not in current]
+    changed_q = [k for k, d in questions.items() if k in current and current[k].difficulty != d]
+    if new_q or changed_q:
+        table = Question.__table__
+        stmt = _insert(session, table)
+        session.connection().execute(
+            stmt.on_conflict_do_update(
+                index_elements=["scenario_id", "text"],
+                set_={"difficulty": stmt.excluded.difficulty},
+                where=table.c.difficulty != stmt.excluded.difficulty,
+            ),
+            [{"scenario_id": sid, "text": text, "difficulty": questions[(sid, text)]} for sid, text in new_q + changed_q],
+        )
+    counts["questions_created"] += len(new_q)
+    counts["questions_updated"] += len(changed_q)
+    counts["questions_unchanged"] += len(questions) - len(new_q) - len(changed_q)
+    return counts
+
+
+def import_content(engine, text: IO[str], fmt: str, chunk_size: int = CHUNK_SIZE,
+                   dry_run: bool = False) -> ImportReport:
+    """Validate and upsert every row of ``text``; one transaction per chunk.
+
+    A chunk that fails to write is rolled back and reported; earlier chunks stay committed.
+    """
+    report = ImportReport()
+    chunk: List[Tuple[int, ImportRow]] = []
+
+    def flush():
+        if not chunk or dry_run:
+            chunk.clear()
+            return
+        try:
+            with Session(engine) as session:
+                counts = _upsert_chunk(session, [r for _, r in chunk])
+                session.commit()
+            catalogue_cache.invalidate()
+            for k, v in counts.items():
+                setattr(report, k, getattr(report, k) + v)
+        except Exception as e:
+            report.error(chunk[0][0], f"chunk of {len(chunk)} rows from line {chunk[0][0]} not written: {e}")
+        chunk.clear()
+
+    for line_no, row, error in iter_rows(text, fmt):
+        report.rows += 1
+        if error:
+            report.error(line_no, error)
+            continue
+        chunk.append((line_no, row))
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+    return report
+
+
+def import_file(engine, fileobj: IO[bytes], fmt: str, **kwargs) -> ImportReport:
+    """``import_content`` over a binary file; UTF-8 with or without a BOM."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        return import_content(engine, text, fmt, **kwargs)
+    finally:
+        text.detach()
@@ -1,10 +1,16 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from .config import APP_NAME
-from .routers import health, ai, auth, interview, admin, scenarios 
+from .config import APP_NAME, METRICS_ENABLED
+from .routers import health, ai, auth, interview, admin, scenarios, metrics, progress
 from .database import init_db
+from .eval_queue import evaluation_queue
+from .retention import retention_job
+from .ai_service import close_gemini_client, get_gemini_client
+from .security import password_hasher
 from .deps import get_current_user
 from .models import User
+from .pagination import NEXT_CURSOR_HEADER
+from .metrics import MetricsMiddleware
 
 app = FastAPI(title=APP_NAME)
 
@@ -14,11 +20,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     init_db()
+    evaluation_queue.start(get_gemini_client)
+    retention_job.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await evaluation_queue.stop()
+    await close_gemini_client()
+    await retention_job.stop()
+    password_hasher.shutdown()
 
 
 @auth.router.get("/me", response_model=dict)
@@ -29,8 +48,11 @@ app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(scenarios.router)
 app.include_router(interview.router)
+app.include_router(progress.router)
 app.include_router(ai.router)
 app.include_router(admin.router) 
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,192 @@
+"""In-process metrics exposed in the Prometheus text format at ``/metrics``.
+
+Counters and histograms are plain numbers behind one lock per metric; an
+observation is a dict lookup, a bisect and two additions, so instrumentation is
+safe to leave on. Values are per process: with several uvicorn workers, scrape
+each worker (or aggregate with ``sum by``). Gauges are computed at scrape time
+by collectors, e.g. the database pool figures.
+"""
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import bisect, threading, time
+
+# Seconds; covers fast DB-only routes through slow model calls.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)  # characters
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (+Inf last)], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        return _Timer(self, labels)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {running}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, hist: Histogram, labels: Tuple[str, ...]):
+        self.hist, self.labels = hist, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        m = Counter(*args, **kwargs)
+        self._metrics.append(m)
+        return m
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        m = Histogram(*args, **kwargs)
+        self._metrics.append(m)
+        return m
+
+    def collector(self, fn: Callable[[], Iterable[str]]):
+        """Register ``fn`` returning exposition lines (typically gauges) computed at scrape time."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines += m.collect()
+        for fn in self._collectors:
+            try:
+                lines += list(fn())
+            except Exception:
+                continue  # a failing collector must not break the scrape
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_num(value)}")
+    return lines
+
+
+REGISTRY = Registry()
+
+# ---- HTTP ----
+http_requests = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status"))
+http_latency = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time until the response body was fully sent.", ("method", "route"))
+
+# ---- Model calls ----
+ai_calls = REGISTRY.counter(
+    "ai_calls_total", "Model calls by operation and outcome (ok|error).", ("op", "outcome"))
+ai_latency = REGISTRY.histogram("ai_call_duration_seconds", "Latency of a single model call.", ("op",))
+ai_retries = REGISTRY.counter("ai_retries_total", "Model calls repeated after a failed attempt.", ("op",))
+ai_fallbacks = REGISTRY.counter(
+    "ai_fallbacks_total", "Requests answered with the canned fallback after all retries failed.", ("op",))
+ai_prompt_chars = REGISTRY.histogram("ai_prompt_chars", "Prompt size in characters.", ("op",), SIZE_BUCKETS)
+ai_response_chars = REGISTRY.histogram("ai_response_chars", "Response size in characters.", ("op",), SIZE_BUCKETS)
+ai_rejections = REGISTRY.counter(
+    "ai_rejections_total", "Model calls refused locally (circuit_open|bulkhead_full).", ("op", "reason"))
+ai_hedges = REGISTRY.counter("ai_hedges_total", "Hedged duplicate requests sent for slow model calls.", ("op",))
+ai_json_parse = REGISTRY.counter(
+    "ai_json_parse_total", "Model output parsing: direct, extracted (JSON embedded in prose) or failed.", ("result",))
+
+# ---- Rate limiting ----
+rate_limit_rejections = REGISTRY.counter(
+    "rate_limit_rejections_total", "Requests rejected with 429 by policy.", ("policy",))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route latency histogram and status counter.
+
+    The route label is the matched path template (``/interview/attempts/{attempt_id}``)
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            http_latency.observe(time.perf_counter() - start, scope["method"], route)
+            http_requests.inc(scope["method"], route, status[0])
@@ -0,0 +1,297 @@
+"""Schema and data upgrades for databases created by older versions.
+
+``SQLModel.metadata.create_all`` only creates missing tables, so columns,
+indexes and backfills for existing tables are applied here. Applied steps are
+recorded in ``schema_migrations`` and run once; schema steps also check the
+live schema first, so a partially upgraded database is handled too.
+``create_all`` and all steps run in one transaction that first takes a
+database-wide lock, so workers starting together set up the schema one after
+another and a backfill never runs twice.
+"""
+from typing import List, Tuple
+import json, time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from .config import SKILL_TREND_ALPHA
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str):
+    if not _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _attempt_status(conn: Connection):
+    if _has_column(conn, "attempts", "status"):
+        return
+    _add_column(conn, "attempts", "status", "VARCHAR NOT NULL DEFAULT 'scored'")
+    # Pre-existing rows without a score were never evaluated; don't let the default call them scored.
+    conn.execute(text("UPDATE attempts SET status = 'failed' WHERE score IS NULL"))
+
+
+def _session_summaries_backfill(conn: Connection):
+    """Seed running rubric totals for sessions scored before session_summaries existed."""
+    missing = conn.execute(text(
+        "SELECT s.id FROM interview_sessions s "
+        "LEFT JOIN session_summaries ss ON ss.session_id = s.id WHERE ss.session_id IS NULL"
+    )).scalars().all()
+    keys = ["relevance", "star_structure", "technical_depth", "communication"]
+    for sid in missing:
+        row = {"session_id": sid, "scored_count": 0, "score_sum": 0.0, "rubric_count": 0}
+        row.update({f"{k}_sum": 0.0 for k in keys})
+        for score, feedback in conn.execute(
+            text("SELECT score, ai_feedback FROM attempts WHERE session_id = :sid AND score IS NOT NULL"),
+            {"sid": sid},
+        ):
+            row["scored_count"] += 1
+            row["score_sum"] += float(score)
+            try:
+                rub = json.loads(feedback or "").get("rubric")
+            except Exception:
+                rub = None
+            if isinstance(rub, dict):
+                row["rubric_count"] += 1
+                for k in keys:
+                    row[f"{k}_sum"] += float(rub.get(k, 0.0))
+        cols = ", ".join(row)
+        conn.execute(text(f"INSERT INTO session_summaries ({cols}) VALUES ({', '.join(':' + c for c in row)})"), row)
+
+
+def _attempt_rubric_columns(conn: Connection):
+    """Typed rubric columns on attempts, backfilled from the ai_feedback JSON."""
+    keys = ["relevance", "star_structure", "technical_depth", "communication"]
+    for k in keys:
+        _add_column(conn, "attempts", k, "FLOAT")
+    rows = conn.execute(text(
+        "SELECT id, ai_feedback FROM attempts WHERE ai_feedback IS NOT NULL AND relevance IS NULL"
+    )).all()
+    for attempt_id, feedback in rows:
+        try:
+            rub = json.loads(feedback or "").get("rubric")
+        except Exception:
+            continue
+        if isinstance(rub, dict):
+            values = {k: float(rub.get(k, 0.0)) for k in keys}
+            conn.execute(
+                text(f"UPDATE attempts SET {', '.join(f'{k} = :{k}' for k in keys)} WHERE id = :id"),
+                {**values, "id": attempt_id},
+            )
+
+
+def _listing_indexes(conn: Connection):
+    """Composite indexes backing the keyset-paginated listings."""
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS ix_interview_sessions_user_started ON interview_sessions (user_id, started_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_attempts_user_created ON attempts (user_id, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_attempts_session_created ON attempts (session_id, created_at, id)",
+    ):
+        conn.execute(text(ddl))
+
+
+def _score_rollups_backfill(conn: Connection):
+    """Seed the analytics rollups from attempts scored before they existed."""
+    keys = ["relevance", "star_structure", "technical_depth", "communication"]
+    rollups, bins = {}, {}
+    rows = conn.execute(text(
+        "SELECT a.user_id, a.question_id, q.scenario_id, a.created_at, a.score, "
+        + ", ".join(f"a.{k}" for k in keys)
+        + " FROM attempts a JOIN questions q ON q.id = a.question_id WHERE a.score IS NOT NULL"
+    ))
+    for user_id, question_id, scenario_id, created_at, score, *rubric in rows:
+        day = str(created_at)[:10]
+        for subject in (("scenario", scenario_id), ("question", question_id), ("user", user_id)):
+            row = rollups.setdefault((*subject, day), {"attempt_count": 0, "score_sum": 0.0, "rubric_count": 0,
+                                                       **{f"{k}_sum": 0.0 for k in keys}})
+            row["attempt_count"] += 1
+            row["score_sum"] += float(score)
+            if rubric[0] is not None:
+                row["rubric_count"] += 1
+                for k, v in zip(keys, rubric):
+                    row[f"{k}_sum"] += float(v or 0.0)
+            b = (*subject, day, int(round(float(score) * 10)))
+            bins[b] = bins.get(b, 0) + 1
+    for (dimension, subject_id, day), row in rollups.items():
+        cols = ["dimension", "subject_id", "day", *row]
+        conn.execute(
+            text(f"INSERT INTO score_rollups ({', '.join(cols)}) VALUES ({', '.join(':' + c for c in cols)})"),
+            {"dimension": dimension, "subject_id": subject_id, "day": day, **row},
+        )
+    for (dimension, subject_id, day, b), count in bins.items():
+        conn.execute(
+            text("INSERT INTO score_histograms (dimension, subject_id, day, bin, count) "
+                 "VALUES (:dimension, :subject_id, :day, :bin, :count)"),
+            {"dimension": dimension, "subject_id": subject_id, "day": day, "bin": b, "count": count},
+        )
+
+
+def _content_indexes(conn: Connection):
+    """Lookups by natural key during bulk import (scenario title, questions of a scenario)."""
+    for ddl in (
+        "CREATE INDEX IF NOT EXISTS ix_interview_scenarios_title ON interview_scenarios (title)",
+        "CREATE INDEX IF NOT EXISTS ix_questions_scenario ON questions (scenario_id)",
+    ):
+        conn.execute(text(ddl))
+
+
+_CASCADES = [  # (table, column, referenced table)
+    ("attempts", "session_id", "interview_sessions"),
+    ("evaluation_jobs", "attempt_id", "attempts"),
+    ("session_summaries", "session_id", "interview_sessions"),
+]
+
+
+def _retention_support(conn: Connection):
+    """Index for the retention scan; ON DELETE CASCADE on session children (Postgres).
+
+    SQLite cannot alter a foreign key without rebuilding the table, so existing
+    SQLite databases keep their constraints; ``retention.delete_sessions``
+    deletes children explicitly and works either way.
+    """
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_interview_sessions_started ON interview_sessions (started_at)"
+    ))
+    if conn.dialect.name != "postgresql":
+        return
+    for table, column, target in _CASCADES:
+        for fk in inspect(conn).get_foreign_keys(table):
+            if fk["constrained_columns"] != [column] or (fk.get("options") or {}).get("ondelete") == "CASCADE":
+                continue
+            conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{fk["name"]}"'))
+            conn.execute(text(
+                f'ALTER TABLE {table} ADD CONSTRAINT "{fk["name"]}" FOREIGN KEY ({column}) '
+                f"REFERENCES {target} (id) ON DELETE CASCADE"
+            ))
+
+
+def _skill_profiles_backfill(conn: Connection):
+    """Seed skill profiles (sums and moving averages, oldest attempt first) from already scored attempts."""
+    keys = ["relevance", "star_structure", "technical_depth", "communication"]
+    profiles = {}
+    rows = conn.execute(text(
+        "SELECT a.user_id, q.scenario_id, a.created_at, a.score, "
+        + ", ".join(f"a.{k}" for k in keys)
+        + " FROM attempts a JOIN questions q ON q.id = a.question_id WHERE a.score IS NOT NULL"
+        " ORDER BY a.created_at, a.id"
+    ))
+    for user_id, scenario_id, created_at, score, *rubric in rows:
+        p = profiles.setdefault((user_id, scenario_id), {
+            "attempt_count": 0, "score_sum": 0.0, "score_ema": 0.0, "rubric_count": 0,
+            **{f"{k}_sum": 0.0 for k in keys}, **{f"{k}_ema": 0.0 for k in keys},
+        })
+        score = float(score)
+        p["score_ema"] = score if not p["attempt_count"] else p["score_ema"] + SKILL_TREND_ALPHA * (score - p["score_ema"])
+        p["attempt_count"] += 1
+        p["score_sum"] += score
+        p["last_score"], p["last_attempt_at"] = score, created_at
+        if rubric[0] is not None:
+            for k, v in zip(keys, rubric):
+                v = float(v or 0.0)
+                p[f"{k}_sum"] += v
+                p[f"{k}_ema"] = v if not p["rubric_count"] else p[f"{k}_ema"] + SKILL_TREND_ALPHA * (v - p[f"{k}_ema"])
+            p["rubric_count"] += 1
+    for (user_id, scenario_id), p in profiles.items():
+        cols = ["user_id", "scenario_id", *p]
+        conn.execute(
+            text(f"INSERT INTO skill_profiles ({', '.join(cols)}) VALUES ({', '.join(':' + c for c in cols)})"),
+            {"user_id": user_id, "scenario_id": scenario_id, **p},
+        )
+
+
+def _eval_cache_created_index(conn: Connection):
+    """Backs the periodic purge of expired evaluation cache rows."""
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_evaluation_cache_created ON evaluation_cache (created_at)"))
+
+
+def _merge(conn: Connection, table: str, key: List[str], refs: List[Tuple[str, str]]) -> int:
+    """Keep the oldest row per ``key``; repoint ``refs`` (table, column) from the others, then delete them."""
+    keeper = f"(SELECT MIN(k.id) FROM {table} k WHERE " + " AND ".join(f"k.{c} = t.{c}" for c in key) + ")"
+    rows = conn.execute(text(f"SELECT t.id, {keeper} FROM {table} t WHERE t.id > {keeper}")).all()
+    if not rows:
+        return 0
+    moves = [{"dup": dup, "keep": keep} for dup, keep in rows]
+    for ref_table, column in refs:
+        conn.execute(text(f"UPDATE {ref_table} SET {column} = :keep WHERE {column} = :dup"), moves)
+    conn.execute(text(f"DELETE FROM {table} WHERE id = :dup"), moves)
+    return len(moves)
+
+
+def _content_unique_keys(conn: Connection):
+    """Enforce the import's natural keys: one scenario per title, one question per (scenario, text).
+
+    Existing duplicates are merged into the oldest row first. Scenario merges
+    move questions and sessions, and skill profiles are rebuilt because they
+    are keyed by scenario. Analytics rollups are history and keep the old ids.
+    """
+    if _merge(conn, "interview_scenarios", ["title"], [("questions", "scenario_id"), ("interview_sessions", "scenario_id")]):
+        conn.execute(text("DELETE FROM skill_profiles"))
+        _skill_profiles_backfill(conn)
+    _merge(conn, "questions", ["scenario_id", "text"], [("attempts", "question_id")])
+    for ddl in (
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_interview_scenarios_title ON interview_scenarios (title)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_questions_scenario_text ON questions (scenario_id, text)",
+        "DROP INDEX IF EXISTS ix_interview_scenarios_title",  # covered by the unique index
+    ):
+        conn.execute(text(ddl))
+
+
+MIGRATIONS = [
+    _attempt_status,
+    _session_summaries_backfill,
+    _attempt_rubric_columns,
+    _listing_indexes,
+    _score_rollups_backfill,
+    _content_indexes,
+    _retention_support,
+    _skill_profiles_backfill,
+    _eval_cache_created_index,
+    _content_unique_keys,
+]
+
+
+MIGRATION_LOCK_KEY = 0x6D696772  # pg_advisory_xact_lock key ("migr")
+
+
+def _lock(conn: Connection):
+    """Serialize migrations across processes until the transaction ends."""
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    elif conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")  # takes the write lock now, before anything is read
+
+
+def _migrate(engine, metadata):
+    with engine.begin() as conn:
+        _lock(conn)
+        if metadata is not None:
+            metadata.create_all(conn)
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations (name VARCHAR PRIMARY KEY, applied_at TIMESTAMP)"
+        ))
+        applied = set(conn.execute(text("SELECT name FROM schema_migrations")).scalars())
+        for step in MIGRATIONS:
+            if step.__name__ in applied:
+                continue
+            step(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (name, applied_at) VALUES (:name, CURRENT_TIMESTAMP)"),
+                {"name": step.__name__},
+            )
+
+
+def run_migrations(engine, metadata=None, lock_wait: float = 300.0):
+    """Create missing tables from ``metadata`` (if given) and apply pending steps under the lock."""
+    # SQLite gives up on a held write lock after busy_timeout; keep waiting while another worker migrates.
+    deadline = time.monotonic() + lock_wait
+    while True:
+        try:
+            return _migrate(engine, metadata)
+        except OperationalError as e:
+            if "locked" not in str(e) or time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
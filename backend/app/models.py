@@ -1,5 +1,6 @@
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, UniqueConstraint, Relationship
 
 # ---- Existing User model (unchanged) ----
@@ -18,6 +19,7 @@ class User(SQLModel, table=True):
 # ---- New Interview domain models ----
 class InterviewScenario(SQLModel, table=True):
     __tablename__ = "interview_scenarios"
+    __table_args__ = (Index("ux_interview_scenarios_title", "title", unique=True),)
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     role: str  # e.g., "Backend Engineer"
@@ -29,6 +31,10 @@ class InterviewScenario(SQLModel, table=True):
 
 class Question(SQLModel, table=True):
     __tablename__ = "questions"
+    __table_args__ = (
+        Index("ix_questions_scenario", "scenario_id"),
+        Index("ux_questions_scenario_text", "scenario_id", "text", unique=True),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     scenario_id: int = Field(foreign_key="interview_scenarios.id")
     text: str
@@ -39,6 +45,10 @@ class Question(SQLModel, table=True):
 
 class InterviewSession(SQLModel, table=True):
     __tablename__ = "interview_sessions"
+    __table_args__ = (
+        Index("ix_interview_sessions_user_started", "user_id", "started_at", "id"),
+        Index("ix_interview_sessions_started", "started_at"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
     scenario_id: int = Field(foreign_key="interview_scenarios.id")
@@ -52,16 +62,112 @@ class InterviewSession(SQLModel, table=True):
 
 class Attempt(SQLModel, table=True):
     __tablename__ = "attempts"
+    __table_args__ = (
+        Index("ix_attempts_user_created", "user_id", "created_at", "id"),
+        Index("ix_attempts_session_created", "session_id", "created_at", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
-    session_id: int = Field(foreign_key="interview_sessions.id")
+    session_id: int = Field(foreign_key="interview_sessions.id", ondelete="CASCADE")
     user_id: int = Field(foreign_key="users.id")
     question_id: int = Field(foreign_key="questions.id")
 
     user_answer: str
     ai_feedback: Optional[str] = None       # filled in Step 4
     score: Optional[float] = None           # filled in Step 4
+    status: str = "scored"  # "pending" | "scored" | "failed"
+    # Rubric dimensions (1-5), copied out of ai_feedback so SQL can aggregate them
+    relevance: Optional[float] = None
+    star_structure: Optional[float] = None
+    technical_depth: Optional[float] = None
+    communication: Optional[float] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     session: Optional[InterviewSession] = Relationship(back_populates="attempts")
     user: Optional[User] = Relationship(back_populates="attempts")
     question: Optional[Question] = Relationship(back_populates="attempts")
+
+class EvaluationCacheEntry(SQLModel, table=True):
+    __tablename__ = "evaluation_cache"
+    __table_args__ = (Index("ix_evaluation_cache_created", "created_at"),)
+    key: str = Field(primary_key=True)  # sha256 of model/prompt version + normalized Q&A
+    model: str
+    payload: str  # evaluation JSON as returned to clients
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class EvaluationJob(SQLModel, table=True):
+    __tablename__ = "evaluation_jobs"
+    __table_args__ = (Index("ix_evaluation_jobs_status_available", "status", "available_at"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    attempt_id: int = Field(foreign_key="attempts.id", index=True, ondelete="CASCADE")
+    status: str = "queued"  # "queued" | "running" | "done" | "failed"
+    tries: int = 0
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class SessionSummary(SQLModel, table=True):
+    """Running rubric totals for a session plus the last AI summary computed from them."""
+    __tablename__ = "session_summaries"
+    session_id: int = Field(foreign_key="interview_sessions.id", primary_key=True, ondelete="CASCADE")
+    scored_count: int = 0
+    score_sum: float = 0.0
+    rubric_count: int = 0
+    relevance_sum: float = 0.0
+    star_structure_sum: float = 0.0
+    technical_depth_sum: float = 0.0
+    communication_sum: float = 0.0
+    summary_json: Optional[str] = None
+    summary_version: Optional[int] = None  # scored_count the stored summary was computed from
+    computed_at: Optional[datetime] = None
+
+class RateLimitState(SQLModel, table=True):
+    """GCRA state shared by all workers: one theoretical arrival time per key."""
+    __tablename__ = "rate_limit_state"
+    key: str = Field(primary_key=True)  # "<policy>:<subject>"
+    tat: float  # unix time at which the key's bucket is fully drained
+
+class ScoreRollup(SQLModel, table=True):
+    """Daily score totals per scenario, question or user, updated as attempts are scored."""
+    __tablename__ = "score_rollups"
+    __table_args__ = (Index("ix_score_rollups_dimension_day", "dimension", "day"),)
+    dimension: str = Field(primary_key=True)  # "scenario" | "question" | "user"
+    subject_id: int = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    attempt_count: int = 0
+    score_sum: float = 0.0
+    rubric_count: int = 0
+    relevance_sum: float = 0.0
+    star_structure_sum: float = 0.0
+    technical_depth_sum: float = 0.0
+    communication_sum: float = 0.0
+
+class ScoreHistogram(SQLModel, table=True):
+    """Overall-score distribution for a ``ScoreRollup`` row, one row per 0.1-wide bin."""
+    __tablename__ = "score_histograms"
+    __table_args__ = (Index("ix_score_histograms_dimension_day", "dimension", "day"),)
+    dimension: str = Field(primary_key=True)
+    subject_id: int = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    bin: int = Field(primary_key=True)  # round(score * 10)
+    count: int = 0
+
+class SkillProfile(SQLModel, table=True):
+    """Running per-user, per-scenario score totals and moving averages, updated as attempts are scored."""
+    __tablename__ = "skill_profiles"
+    user_id: int = Field(primary_key=True)
+    scenario_id: int = Field(primary_key=True)
+    attempt_count: int = 0
+    score_sum: float = 0.0
+    score_ema: float = 0.0  # exponential moving average; above the mean means recent attempts score higher
+    rubric_count: int = 0
+    relevance_sum: float = 0.0
+    star_structure_sum: float = 0.0
+    technical_depth_sum: float = 0.0
+    communication_sum: float = 0.0
+    relevance_ema: float = 0.0
+    star_structure_ema: float = 0.0
+    technical_depth_ema: float = 0.0
+    communication_ema: float = 0.0
+    last_score: Optional[float] = None
+    last_attempt_at: Optional[datetime] = None
@@ -0,0 +1,76 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Lists keep returning a plain JSON array; when more rows exist the opaque
+cursor for the next page is sent in the ``X-Next-Cursor`` response header.
+Cursors encode the sort key of the last row, so each page is an index range
+scan no matter how deep the client pages.
+"""
+from typing import Any, List, Optional, Sequence
+from datetime import date, datetime
+import base64, json
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+        cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])  # dates and datetimes
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, n: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != n:
+            raise ValueError
+        return values
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def after_cursor(stmt, ts_col, id_col, cursor: Optional[str], descending: bool = True):
+    """Restrict ``stmt`` (ordered by ``ts_col, id_col``) to rows after ``cursor``."""
+    if not cursor:
+        return stmt
+    ts, last_id = decode_cursor(cursor, 2)
+    try:
+        ts = datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        raise HTTPException(400, "Invalid cursor")
+    if descending:
+        return stmt.where(or_(ts_col < ts, and_(ts_col == ts, id_col < last_id)))
+    return stmt.where(or_(ts_col > ts, and_(ts_col == ts, id_col > last_id)))
+
+
+def after_id(stmt, id_col, cursor: Optional[str]):
+    if not cursor:
+        return stmt
+    (last_id,) = decode_cursor(cursor, 1)
+    return stmt.where(id_col > last_id)
+
+
+def paginate(rows: Sequence, limit: int, response: Response, key) -> list:
+    """Trim the extra look-ahead row and publish the next cursor, if any.
+
+    Queries fetch ``limit + 1`` rows; ``key(row)`` returns the sort key tuple.
+    """
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
@@ -0,0 +1,105 @@
+"""Per-user skill profiles behind ``/me/progress``.
+
+``record_progress`` folds each newly scored attempt into the user's
+``skill_profiles`` row for its scenario with one upsert: counts and sums for
+the means, plus exponential moving averages (weight ``SKILL_TREND_ALPHA`` on
+the newest attempt) for the trend. Both are computed by the database, so
+concurrent workers don't lose updates. Reading a profile is one indexed range
+scan on the primary key. Like the analytics rollups, profiles are history and
+outlive purged sessions.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .ai_service import RUBRIC_KEYS
+from .config import SKILL_TREND_ALPHA
+from .models import Attempt, InterviewScenario, SkillProfile
+
+
+def record_progress(session: Session, attempt: Attempt, scenario_id: int, rubric: Optional[Dict[str, float]],
+                    alpha: float = SKILL_TREND_ALPHA):
+    """Add ``attempt``'s score to the user's profile for ``scenario_id`` (caller commits)."""
+    table = SkillProfile.__table__
+    values: Dict[str, Any] = {
+        "user_id": attempt.user_id, "scenario_id": scenario_id, "attempt_count": 1,
+        "score_sum": attempt.score, "score_ema": attempt.score, "rubric_count": 0,
+        "last_score": attempt.score, "last_attempt_at": attempt.created_at,
+    }
+    if isinstance(rubric, dict):
+        values["rubric_count"] = 1
+        for k in RUBRIC_KEYS:
+            values[f"{k}_sum"] = values[f"{k}_ema"] = float(rubric.get(k, 0.0))
+    dialect = session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(table).values(**values)
+    new = stmt.excluded
+
+    def ema(col: str, count_col: str):
+        # the first sample seeds the average
+        return case((table.c[count_col] == 0, new[col]), else_=table.c[col] + alpha * (new[col] - table.c[col]))
+
+    update = {
+        "attempt_count": table.c.attempt_count + 1,
+        "score_sum": table.c.score_sum + new.score_sum,
+        "score_ema": ema("score_ema", "attempt_count"),
+        "last_score": new.last_score,
+        "last_attempt_at": new.last_attempt_at,
+    }
+    if isinstance(rubric, dict):
+        update["rubric_count"] = table.c.rubric_count + 1
+        for k in RUBRIC_KEYS:
+            update[f"{k}_sum"] = table.c[f"{k}_sum"] + new[f"{k}_sum"]
+            update[f"{k}_ema"] = ema(f"{k}_ema", "rubric_count")
+    session.connection().execute(stmt.on_conflict_do_update(index_elements=["user_id", "scenario_id"], set_=update))
+
+
+def _dimension(total: float, count: int, ema: float) -> Dict[str, Optional[float]]:
+    if not count:
+        return {"mean": None, "recent": None, "trend": None}
+    mean = total / count
+    return {"mean": round(mean, 2), "recent": round(ema, 2), "trend": round(ema - mean, 2)}
+
+
+def _entry(p: SkillProfile) -> Dict[str, Any]:
+    return {
+        "attempts": p.attempt_count,
+        "score": _dimension(p.score_sum, p.attempt_count, p.score_ema),
+        "rubric": {k: _dimension(getattr(p, f"{k}_sum"), p.rubric_count, getattr(p, f"{k}_ema"))
+                   for k in RUBRIC_KEYS},
+        "last_score": p.last_score,
+        "last_attempt_at": p.last_attempt_at,
+    }
+
+
+async def user_progress(session: AsyncSession, user_id: int) -> Dict[str, Any]:
+    """Per-scenario profiles (most recently practised first) and an overall view weighted by attempts."""
+    rows: List = (await session.exec(
+        select(SkillProfile, InterviewScenario.title)
+        .join(InterviewScenario, InterviewScenario.id == SkillProfile.scenario_id, isouter=True)
+        .where(SkillProfile.user_id == user_id)
+        .order_by(SkillProfile.last_attempt_at.desc())
+    )).all()
+    total = SkillProfile(user_id=user_id, scenario_id=0)
+    for p, _ in rows:
+        total.attempt_count += p.attempt_count
+        total.score_sum += p.score_sum
+        total.score_ema += p.score_ema * p.attempt_count
+        total.rubric_count += p.rubric_count
+        for k in RUBRIC_KEYS:
+            setattr(total, f"{k}_sum", getattr(total, f"{k}_sum") + getattr(p, f"{k}_sum"))
+            setattr(total, f"{k}_ema", getattr(total, f"{k}_ema") + getattr(p, f"{k}_ema") * p.rubric_count)
+        if p.last_attempt_at and (total.last_attempt_at is None or p.last_attempt_at > total.last_attempt_at):
+            total.last_attempt_at, total.last_score = p.last_attempt_at, p.last_score
+    if total.attempt_count:
+        total.score_ema /= total.attempt_count
+    if total.rubric_count:
+        for k in RUBRIC_KEYS:
+            setattr(total, f"{k}_ema", getattr(total, f"{k}_ema") / total.rubric_count)
+    return {
+        "overall": _entry(total),
+        "scenarios": [{"scenario_id": p.scenario_id, "scenario_title": title, **_entry(p)} for p, title in rows],
+    }
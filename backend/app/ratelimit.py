@@ -1,17 +1,160 @@
-import time
-from fastapi import HTTPException
-
-# Simple per-user token bucket: 10 requests/min per user for AI-eval endpoints
-RATE = 10
-WINDOW = 60  # seconds
-_buckets = {}  # user_id -> [timestamps]
-
-def ensure_rate(user_id: int):
-    now = time.time()
-    q = _buckets.setdefault(user_id, [])
-    # drop old
-    while q and now - q[0] > WINDOW:
-        q.pop(0)
-    if len(q) >= RATE:
-        raise HTTPException(status_code=429, detail="Rate limit exceeded (10 requests/min)")
-    q.append(now)
+"""Rate limiting with GCRA (generic cell rate algorithm).
+
+Each key stores a single number, its theoretical arrival time (TAT), so a
+check is O(1) in time and memory. ``RATE_LIMIT_BACKEND=db`` keeps TATs in the
+``rate_limit_state`` table so every uvicorn worker enforces the same limit;
+``memory`` keeps them in a bounded per-process LRU.
+"""
+from typing import Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import math, threading, time
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from .config import RATE_LIMIT_BACKEND, RATE_LIMIT_MAX_KEYS, RATE_LIMIT_AI
+from .database import engine
+from .metrics import rate_limit_rejections
+from .deps import get_current_user
+from .models import RateLimitState
+
+
+@dataclass(frozen=True)
+class Policy:
+    name: str
+    rate: int        # requests allowed ...
+    period: float    # ... per this many seconds (also the burst size)
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.rate
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "Policy":
+        rate, period = spec.split("/")
+        return cls(name, int(rate), float(period))
+
+    def describe(self) -> str:
+        if self.period == 60:
+            return f"{self.rate} requests/min"
+        return f"{self.rate} requests/{self.period:g}s"
+
+
+POLICIES: Dict[str, Policy] = {
+    "ai": Policy.parse("ai", RATE_LIMIT_AI),
+}
+
+
+def _gcra(policy: Policy, tat: Optional[float], now: float) -> Tuple[bool, float, float]:
+    """Return (allowed, new_tat, retry_after)."""
+    tat = max(tat or now, now)
+    allow_at = tat - (policy.period - policy.interval)
+    if now < allow_at:
+        return False, tat, allow_at - now
+    return True, tat + policy.interval, 0.0
+
+
+class MemoryStore:
+    """Per-process store; LRU-bounded so idle users don't accumulate forever."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, policy: Policy, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            allowed, new_tat, retry_after = _gcra(policy, self._tats.get(key), now)
+            if allowed:
+                self._tats[key] = new_tat
+                self._tats.move_to_end(key)
+                while len(self._tats) > self.max_keys:
+                    self._tats.popitem(last=False)
+            return allowed, retry_after
+
+
+class DatabaseStore:
+    """Shared store; a compare-and-set on the TAT makes concurrent workers safe."""
+
+    def __init__(self, db_engine=engine, max_retries: int = 5, purge_every: int = 1000):
+        self.engine = db_engine
+        self.max_retries = max_retries
+        self.purge_every = purge_every
+        self._calls = 0
+
+    def hit(self, key: str, policy: Policy, now: float) -> Tuple[bool, float]:
+        self._calls += 1
+        if self._calls % self.purge_every == 0:
+            self._purge(now)
+        table = RateLimitState.__table__
+        for _ in range(self.max_retries):
+            with self.engine.begin() as conn:
+                old = conn.execute(select(table.c.tat).where(table.c.key == key)).scalar()
+                allowed, new_tat, retry_after = _gcra(policy, old, now)
+                if not allowed:
+                    return False, retry_after
+                try:
+                    if old is None:
+                        conn.execute(insert(table).values(key=key, tat=new_tat))
+                        return True, 0.0
+                    res = conn.execute(
+                        update(table).where(table.c.key == key, table.c.tat == old).values(tat=new_tat)
+                    )
+                    if res.rowcount == 1:
+                        return True, 0.0
+                except IntegrityError:
+                    pass  # another worker inserted the key first
+        # Persistent contention on one key: treat as over the limit.
+        return False, policy.interval
+
+    def _purge(self, now: float):
+        """Drop keys whose bucket has fully drained; they behave like absent keys."""
+        table = RateLimitState.__table__
+        with self.engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.tat < now))
+
+
+def _make_store():
+    if RATE_LIMIT_BACKEND == "memory":
+        return MemoryStore()
+    return DatabaseStore()
+
+
+store = _make_store()
+
+
+def check_rate(subject, policy: str = "ai") -> None:
+    """Count one request for ``subject`` under ``policy``; raise 429 when over the limit."""
+    pol = POLICIES[policy]
+    allowed, retry_after = store.hit(f"{pol.name}:{subject}", pol, time.time())
+    if not allowed:
+        rate_limit_rejections.inc(pol.name)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded ({pol.describe()})",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def ensure_rate(user_id: int, policy: str = "ai"):
+    check_rate(user_id, policy)
+
+
+async def aensure_rate(user_id: int, policy: str = "ai"):
+    """``ensure_rate`` for async handlers; the DB backend runs in the threadpool."""
+    if isinstance(store, MemoryStore):
+        check_rate(user_id, policy)
+    else:
+        await run_in_threadpool(check_rate, user_id, policy)
+
+
+def rate_limit(policy: str) -> Callable:
+    """Route dependency applying ``policy`` per authenticated user."""
+    async def dependency(user=Depends(get_current_user)):
+        await aensure_rate(user.id, policy)
+        return user
+
+    return dependency
@@ -0,0 +1,101 @@
+"""Read queries shared by the interview and admin routers.
+
+Each helper issues a fixed number of statements regardless of how many rows
+come back; related rows are fetched with joins instead of per-row ``get``.
+Helpers take the request session from ``database.get_db``.
+"""
+from typing import List, Optional, Tuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models import User, InterviewSession, InterviewScenario, Question, Attempt
+from .pagination import after_cursor, after_id
+
+
+async def session_attempts_with_questions(
+    session: AsyncSession, session_id: int, scored_only: bool = False
+) -> List[Tuple[Attempt, Optional[Question]]]:
+    stmt = (
+        select(Attempt, Question)
+        .join(Question, Question.id == Attempt.question_id, isouter=True)
+        .where(Attempt.session_id == session_id)
+        .order_by(Attempt.created_at.asc(), Attempt.id.asc())
+    )
+    if scored_only:
+        stmt = stmt.where(Attempt.status == "scored")
+    return (await session.exec(stmt)).all()
+
+
+async def user_attempts(
+    session: AsyncSession, user_id: int, session_id: Optional[int] = None,
+    limit: Optional[int] = None, cursor: Optional[str] = None,
+) -> List[Attempt]:
+    """Newest first; with ``limit`` one extra row is fetched as a has-more probe."""
+    stmt = (
+        select(Attempt)
+        .where(Attempt.user_id == user_id)
+        .order_by(Attempt.created_at.desc(), Attempt.id.desc())
+    )
+    if session_id:
+        stmt = stmt.where(Attempt.session_id == session_id)
+    stmt = after_cursor(stmt, Attempt.created_at, Attempt.id, cursor)
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    return (await session.exec(stmt)).all()
+
+
+async def user_sessions(
+    session: AsyncSession, user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None,
+) -> List[InterviewSession]:
+    stmt = (
+        select(InterviewSession)
+        .where(InterviewSession.user_id == user_id)
+        .order_by(InterviewSession.started_at.desc(), InterviewSession.id.desc())
+    )
+    stmt = after_cursor(stmt, InterviewSession.started_at, InterviewSession.id, cursor)
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    return (await session.exec(stmt)).all()
+
+
+async def all_users(session: AsyncSession, limit: Optional[int] = None, cursor: Optional[str] = None) -> List[User]:
+    stmt = after_id(select(User).order_by(User.id), User.id, cursor)
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    return (await session.exec(stmt)).all()
+
+
+async def session_attempts_detailed(
+    session: AsyncSession, session_id: int, limit: Optional[int] = None, cursor: Optional[str] = None,
+) -> List[Tuple[Attempt, Optional[Question], Optional[InterviewSession], Optional[InterviewScenario]]]:
+    """Attempts of a session with their question, session and scenario in one query."""
+    stmt = (
+        select(Attempt, Question, InterviewSession, InterviewScenario)
+        .join(Question, Question.id == Attempt.question_id, isouter=True)
+        .join(InterviewSession, InterviewSession.id == Attempt.session_id, isouter=True)
+        .join(InterviewScenario, InterviewScenario.id == InterviewSession.scenario_id, isouter=True)
+        .where(Attempt.session_id == session_id)
+        .order_by(Attempt.created_at.asc(), Attempt.id.asc())
+    )
+    stmt = after_cursor(stmt, Attempt.created_at, Attempt.id, cursor, descending=False)
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    return (await session.exec(stmt)).all()
+
+
+async def session_with_questions(
+    session: AsyncSession, session_id: int
+) -> Tuple[Optional[InterviewSession], Optional[InterviewScenario], List[Question]]:
+    row = (await session.exec(
+        select(InterviewSession, InterviewScenario)
+        .join(InterviewScenario, InterviewScenario.id == InterviewSession.scenario_id, isouter=True)
+        .where(InterviewSession.id == session_id)
+    )).first()
+    if not row:
+        return None, None, []
+    sess, scenario = row
+    questions = (await session.exec(
+        select(Question).where(Question.scenario_id == sess.scenario_id).order_by(Question.id)
+    )).all() if scenario else []
+    return sess, scenario, questions
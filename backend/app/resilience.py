@@ -0,0 +1,125 @@
+"""Failure isolation for calls to the model API.
+
+- ``CircuitBreaker`` fails fast after repeated upstream failures and lets a
+  single probe through once ``reset_seconds`` have passed.
+- ``Bulkhead`` caps in-flight calls per process; callers wait at most
+  ``max_wait`` seconds for a slot instead of queueing without bound.
+- ``LatencyWindow`` keeps recent call latencies so hedged requests can be
+  sent once a call is slower than a chosen percentile.
+"""
+from collections import deque
+from typing import Optional
+import asyncio, threading, time
+
+
+class ModelUnavailableError(RuntimeError):
+    """The call was not attempted; retrying right away will not help."""
+
+    retry_after: float = 1.0
+
+
+class CircuitOpenError(ModelUnavailableError):
+    def __init__(self, retry_after: float):
+        super().__init__(f"model circuit open; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class BulkheadFullError(ModelUnavailableError):
+    def __init__(self):
+        super().__init__("too many model calls in flight")
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise ``CircuitOpenError`` unless the call may go upstream."""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            waited = time.monotonic() - self._opened_at
+            if self.state == self.OPEN and waited >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(max(1.0, self.reset_seconds - waited))
+
+    def on_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def on_abandoned(self):
+        """The call was cancelled before it finished: no verdict, free the probe slot."""
+        with self._lock:
+            self._probing = False
+
+    def on_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class Bulkhead:
+    def __init__(self, limit: int, max_wait: float):
+        self.limit = limit
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._sem = asyncio.Semaphore(limit)
+
+    async def acquire(self):
+        try:
+            await asyncio.wait_for(self._sem.acquire(), self.max_wait)
+        except asyncio.TimeoutError:
+            raise BulkheadFullError() from None
+        self.in_flight += 1
+
+    async def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now (never waits)."""
+        if self._sem.locked():
+            return False
+        await self._sem.acquire()  # returns immediately: a slot is free and nothing ran in between
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._sem.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+class LatencyWindow:
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: "deque[float]" = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -0,0 +1,124 @@
+"""Set-based deletion of interview sessions and the retention purge built on it.
+
+``delete_sessions`` removes sessions with their attempts, queued evaluations
+and summaries in four statements, whatever the number of rows. The purge
+selects expired sessions (``started_at`` older than the retention age) in
+chunks of ``chunk_size``. Each chunk is deleted and committed in its own short
+transaction, and the job pauses between chunks, so a purge never holds locks
+for long on a busy database. The analytics rollups are history and are kept.
+With an archive directory, everything a run is about to delete is first
+exported there as gzipped NDJSON. Nothing is deleted if the archive fails.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import asyncio, logging, os, time
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Connection
+
+from . import exporter
+from .config import (
+    RETENTION_ARCHIVE_DIR, RETENTION_CHUNK_SIZE, RETENTION_DAYS, RETENTION_INTERVAL_SECONDS, RETENTION_PAUSE_SECONDS,
+)
+from .database import engine
+from .models import Attempt, EvaluationJob, InterviewSession, SessionSummary
+
+log = logging.getLogger(__name__)
+
+
+def delete_sessions(conn: Connection, session_ids: List[int]) -> Dict[str, int]:
+    """Delete ``session_ids`` and every row that references them; children go first (FKs are enforced)."""
+    if not session_ids:
+        return {"sessions": 0, "attempts": 0, "jobs": 0}
+    attempts = select(Attempt.id).where(Attempt.session_id.in_(session_ids))
+    jobs = conn.execute(delete(EvaluationJob).where(EvaluationJob.attempt_id.in_(attempts))).rowcount
+    n_attempts = conn.execute(delete(Attempt).where(Attempt.session_id.in_(session_ids))).rowcount
+    conn.execute(delete(SessionSummary).where(SessionSummary.session_id.in_(session_ids)))
+    n_sessions = conn.execute(delete(InterviewSession).where(InterviewSession.id.in_(session_ids))).rowcount
+    return {"sessions": n_sessions, "attempts": n_attempts, "jobs": jobs}
+
+
+def _archive(db_engine, archive_dir: str, cutoff: datetime) -> List[str]:
+    os.makedirs(archive_dir, exist_ok=True)
+    stamp = cutoff.strftime("%Y%m%dT%H%M%S")
+    filters = exporter.ExportFilter(session_started_before=cutoff)
+    paths = []
+    for kind in exporter.KINDS:
+        path = os.path.join(archive_dir, f"{kind}-before-{stamp}.ndjson.gz")
+        tmp = path + ".part"
+        with open(tmp, "wb") as f:
+            for chunk in exporter.export(db_engine, kind, "ndjson", filters, gzip=True):
+                f.write(chunk)
+        os.replace(tmp, path)  # only complete archives get the final name
+        paths.append(path)
+    return paths
+
+
+def purge_expired(db_engine=engine, older_than_days: int = RETENTION_DAYS, chunk_size: int = RETENTION_CHUNK_SIZE,
+                  archive_dir: Optional[str] = RETENTION_ARCHIVE_DIR, pause: float = RETENTION_PAUSE_SECONDS,
+                  dry_run: bool = False, now: Optional[datetime] = None) -> dict:
+    """Delete sessions started more than ``older_than_days`` ago, ``chunk_size`` sessions per transaction."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    expired = InterviewSession.started_at < cutoff
+    report = {"cutoff": cutoff.isoformat(), "sessions": 0, "attempts": 0, "jobs": 0, "chunks": 0, "archives": []}
+    if dry_run:
+        with db_engine.connect() as conn:
+            report["sessions"] = conn.execute(select(func.count()).where(expired)).scalar_one()
+            report["attempts"] = conn.execute(
+                select(func.count()).select_from(Attempt)
+                .where(Attempt.session_id.in_(select(InterviewSession.id).where(expired)))
+            ).scalar_one()
+        return report
+    if archive_dir:
+        with db_engine.connect() as conn:
+            anything = conn.execute(select(InterviewSession.id).where(expired).limit(1)).first()
+        if anything is None:
+            return report
+        report["archives"] = _archive(db_engine, archive_dir, cutoff)
+    while True:
+        with db_engine.begin() as conn:
+            ids = conn.execute(
+                select(InterviewSession.id).where(expired).order_by(InterviewSession.id).limit(chunk_size)
+            ).scalars().all()
+            counts = delete_sessions(conn, ids)
+        if not ids:
+            return report
+        report["chunks"] += 1
+        for k, v in counts.items():
+            report[k] += v
+        if pause:
+            time.sleep(pause)
+
+
+class RetentionJob:
+    """Runs ``purge_expired`` every ``interval`` seconds; disabled when ``days`` is 0."""
+
+    def __init__(self, days: int = RETENTION_DAYS, interval: float = RETENTION_INTERVAL_SECONDS):
+        self.days = days
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.days > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                report = await asyncio.to_thread(purge_expired, engine, self.days)
+                if report["sessions"]:
+                    log.info("Retention purge: %s", report)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Retention purge failed")
+            await asyncio.sleep(self.interval)
+
+
+retention_job = RetentionJob()
@@ -1,28 +1,144 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from ..database import get_session
-from ..deps import get_current_user
-from ..models import User, InterviewSession, Attempt
+from typing import Literal, Optional
+from datetime import date, datetime
+import asyncio, tempfile
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..database import engine, get_db
+from ..deps import get_current_user, principal_cache
+from ..models import User
+from ..eval_cache import eval_cache
+from .. import analytics, repository
+from ..exporter import BATCH_SIZE, MEDIA_TYPES, ExportFilter, export, filename
+from ..importer import CHUNK_SIZE, ImportReport, detect_format, import_file
+from ..pagination import PageParams, paginate
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/users")
-def all_users(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+async def all_users(response: Response, page: PageParams = Depends(), session: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
     if user.role != "admin":
         raise HTTPException(403, "Admins only")
-    users = session.exec(select(User)).all()
+    users = paginate(await repository.all_users(session, page.limit, page.cursor), page.limit, response, lambda u: (u.id,))
     return [u.model_dump() for u in users]
 
 @router.get("/users/{user_id}/sessions")
-def user_sessions(user_id: int, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+async def user_sessions(user_id: int, response: Response, page: PageParams = Depends(), session: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
     if user.role != "admin":
         raise HTTPException(403, "Admins only")
-    sessions = session.exec(select(InterviewSession).where(InterviewSession.user_id == user_id)).all()
-    return [s.model_dump() for s in sessions]
+    rows = await repository.user_sessions(session, user_id, page.limit, page.cursor)
+    return [s.model_dump() for s in paginate(rows, page.limit, response, lambda s: (s.started_at, s.id))]
 
 @router.get("/sessions/{session_id}/attempts")
-def session_attempts(session_id: int, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+async def session_attempts(session_id: int, response: Response, page: PageParams = Depends(), session: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
+    if user.role != "admin":
+        raise HTTPException(403, "Admins only")
+    rows = await repository.session_attempts_detailed(session, session_id, page.limit, page.cursor)
+    rows = paginate(rows, page.limit, response, lambda r: (r[0].created_at, r[0].id))
+    return [
+        {
+            **a.model_dump(),
+            "question_text": q.text if q else None,
+            "scenario_id": sess.scenario_id if sess else None,
+            "scenario_title": scn.title if scn else None,
+        }
+        for a, q, sess, scn in rows
+    ]
+
+@router.get("/eval-cache")
+async def eval_cache_stats(user: User = Depends(get_current_user)):
+    if user.role != "admin":
+        raise HTTPException(403, "Admins only")
+    if eval_cache is None:
+        return {"enabled": False}
+    return eval_cache.stats()
+
+@router.get("/analytics/{dimension}")
+async def score_analytics(
+    dimension: Literal["scenario", "question", "user"],
+    response: Response,
+    granularity: Literal["day", "week", "month", "total"] = "total",
+    subject_id: Optional[int] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Attempt counts, mean/p50/p90 overall score and rubric averages per subject and bucket.
+
+    Served from the rollup tables; newest bucket first, busiest subject first within a bucket.
+    Paged like the other listings: pass ``X-Next-Cursor`` back as ``cursor``.
+    """
+    if user.role != "admin":
+        raise HTTPException(403, "Admins only")
+    rows = await analytics.report(session, dimension, granularity, subject_id, since, until, page.limit, page.cursor)
+    return paginate(rows, page.limit, response, analytics.cursor_key)
+
+@router.post("/import", response_model=ImportReport)
+async def bulk_import(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    chunk_size: int = Query(CHUNK_SIZE, ge=1, le=5000),
+    dry_run: bool = False,
+    user: User = Depends(get_current_user),
+):
+    """Upsert scenarios and questions from the raw request body (NDJSON or CSV).
+
+    The body is spooled to a temp file as it arrives and parsed in a worker
+    thread, so large uploads neither sit in memory nor block the event loop.
+    Format comes from ``?format=`` or the Content-Type.
+    """
+    if user.role != "admin":
+        raise HTTPException(403, "Admins only")
+    fmt = format or detect_format(None, request.headers.get("content-type"))
+    with tempfile.SpooledTemporaryFile(max_size=1 << 20) as spool:
+        async for part in request.stream():
+            spool.write(part)
+        spool.seek(0)
+        return await asyncio.to_thread(import_file, engine, spool, fmt, chunk_size=chunk_size, dry_run=dry_run)
+
+@router.get("/export/{kind}")
+async def bulk_export(
+    kind: Literal["attempts", "sessions"],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    scenario_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    batch_size: int = Query(BATCH_SIZE, ge=1, le=10000),
+    user: User = Depends(get_current_user),
+):
+    """Stream every matching attempt or session as a file download.
+
+    ``since`` is inclusive and ``until`` exclusive (``created_at`` for attempts,
+    ``started_at`` for sessions). Rows are read with a server-side cursor and
+    encoded batch by batch in the threadpool, so memory stays flat.
+    """
+    if user.role != "admin":
+        raise HTTPException(403, "Admins only")
+    body = export(engine, kind, format, ExportFilter(since, until, scenario_id, user_id), gzip, batch_size)
+    return StreamingResponse(
+        body,
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename(kind, format, gzip)}"'},
+    )
+
+class RoleUpdate(BaseModel):
+    role: str = Field(..., pattern="^(user|admin)$")
+
+@router.post("/users/{user_id}/role")
+async def set_user_role(user_id: int, body: RoleUpdate, session: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
     if user.role != "admin":
         raise HTTPException(403, "Admins only")
-    atts = session.exec(select(Attempt).where(Attempt.session_id == session_id)).all()
-    return [a.model_dump() for a in atts]
+    target = await session.get(User, user_id)
+    if not target:
+        raise HTTPException(404, "User not found")
+    target.role = body.role
+    session.add(target)
+    await session.commit()
+    principal_cache.invalidate_user(user_id=target.id, email=target.email)
+    return {"id": target.id, "role": target.role}
@@ -1,11 +1,13 @@
+import math
+
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
-from ..ai_service import GeminiClient
-from ..deps import get_current_user
+from ..ai_service import GeminiClient, get_gemini_client
+from ..resilience import ModelUnavailableError
 from ..models import User
+from ..ratelimit import rate_limit
 
 router = APIRouter(prefix="/ai", tags=["ai"])
-gc = GeminiClient()
 
 class PingRequest(BaseModel):
     prompt: str = Field(..., example="Say hello in a friendly way.")
@@ -14,9 +16,16 @@ class PingResponse(BaseModel):
     reply: str
 
 @router.post("/ping", response_model=PingResponse)
-def ai_ping(req: PingRequest, user: User = Depends(get_current_user)):
+async def ai_ping(
+    req: PingRequest,
+    user: User = Depends(rate_limit("ai")),
+    gc: GeminiClient = Depends(get_gemini_client),
+):
     try:
-        reply = gc.generate_text(req.prompt)
+        reply = await gc.agenerate_text(req.prompt)
         return PingResponse(reply=reply)
+    except ModelUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Gemini unavailable: {e}",
+                            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Gemini error: {e}")
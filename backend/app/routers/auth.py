@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr, Field
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional
 import os
 
-from ..database import get_session
+from ..database import get_db, release_connection
 from ..models import User
-from ..security import get_password_hash, verify_password, create_access_token
+from ..security import password_hasher, create_access_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -31,29 +32,40 @@ class MeResponse(BaseModel):
     role: str
 
 @router.post("/register", response_model=MeResponse, status_code=201)
-def register(req: RegisterRequest, session: Session = Depends(get_session)):
-    existing = session.exec(select(User).where(User.email == req.email)).first()
+async def register(req: RegisterRequest, session: AsyncSession = Depends(get_db)):
+    existing = (await session.exec(select(User).where(User.email == req.email))).first()
     if existing:
         raise HTTPException(status_code=409, detail="Email already registered")
+    await release_connection(session)  # bcrypt runs off the request path; don't pin a connection
 
     role = "admin" if req.email.lower() == os.getenv("ADMIN_EMAIL", "").lower() else "user"
 
     user = User(
         name=req.name,
         email=req.email,
-        password_hash=get_password_hash(req.password),
+        password_hash=await password_hasher.hash(req.password),
         role=role,
     )
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
     return MeResponse(id=user.id, name=user.name, email=user.email, role=user.role)
 
 @router.post("/login", response_model=TokenResponse)
-def login(req: LoginRequest, session: Session = Depends(get_session)):
-    user = session.exec(select(User).where(User.email == req.email)).first()
-    if not user or not verify_password(req.password, user.password_hash):
+async def login(req: LoginRequest, session: AsyncSession = Depends(get_db)):
+    user = (await session.exec(select(User).where(User.email == req.email))).first()
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    await release_connection(session)
+    valid, new_hash = await password_hasher.verify_and_update(req.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        # stored hash used an outdated bcrypt cost
+        user.password_hash = new_hash
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
 
     token = create_access_token({"sub": user.email, "role": user.role})
     return TokenResponse(access_token = create_access_token({"id": user.id, "email": user.email, "role": user.role})
@@ -1,8 +1,13 @@
 
 from fastapi import APIRouter
+from ..database import pool_status
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 @router.get("")
 def health_root():
     return {"status": "ok"}
+
+@router.get("/db")
+def health_db():
+    return {"status": "ok", "pool": pool_status()}
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-from sqlmodel import Session, select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime
-import json
+import asyncio, json
 
-from ..database import get_session
+from ..database import get_db, engine, release_connection
 from ..deps import get_current_user
-from ..models import User, InterviewSession, InterviewScenario, Question, Attempt
-from ..ai_service import GeminiClient
-from ..ratelimit import ensure_rate
+from ..models import User, InterviewSession, InterviewScenario, Question, Attempt, SessionSummary
+from ..ai_service import GeminiClient, get_gemini_client
+from ..eval_queue import evaluation_queue
+from ..ratelimit import aensure_rate
+from ..retention import delete_sessions
+from .. import repository
+from ..pagination import PageParams, paginate
+from ..scoring import record_evaluation, session_averages, attempt_feedback, attempt_rubric
 
 router = APIRouter(prefix="/interview", tags=["interview"])
-gc = GeminiClient()
 
 # --------- Schemas ---------
 class StartSessionIn(BaseModel):
@@ -41,6 +47,7 @@ class AttemptOut(BaseModel):
     user_answer: str
     ai_feedback: Optional[str]
     score: Optional[float]
+    status: str = "scored"
     created_at: datetime
     rubric: Optional[Dict[str, float]] = None
 
@@ -57,155 +64,264 @@ class SessionSummaryOut(BaseModel):
     improvements: List[str]
 
 # --------- Helpers ---------
-def _extract_rubric(attempt: Attempt) -> Optional[Dict[str, float]]:
-    try:
-        data = json.loads(attempt.ai_feedback or "")
-        rub = data.get("rubric")
-        if isinstance(rub, dict):
-            keys = ["relevance", "star_structure", "technical_depth", "communication"]
-            return {k: float(rub.get(k, 0.0)) for k in keys}
-    except Exception:
-        pass
-    return None
+async def _answerable_question(session: AsyncSession, body: AnswerIn, user: User) -> Question:
+    # Validate session & ownership
+    sess = await session.get(InterviewSession, body.session_id)
+    if not sess or sess.user_id != user.id:
+        raise HTTPException(404, "Session not found")
+    if sess.status != "active":
+        raise HTTPException(400, "Session is not active")
+
+    # Validate question in scenario
+    q = await session.get(Question, body.question_id)
+    if not q or q.scenario_id != sess.scenario_id:
+        raise HTTPException(400, "Question does not belong to session's scenario")
+    return q
+
+SSE_POLL_SECONDS = 1.0
+SSE_MAX_POLLS = 300
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
 
 # --------- Endpoints ---------
 @router.post("/sessions/start", response_model=SessionOut)
-def start_session(
+async def start_session(
     body: StartSessionIn,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    scenario = session.get(InterviewScenario, body.scenario_id)
+    scenario = await session.get(InterviewScenario, body.scenario_id)
     if not scenario:
         raise HTTPException(404, "Scenario not found")
     sess = InterviewSession(user_id=user.id, scenario_id=scenario.id, status="active")
     session.add(sess)
-    session.commit()
-    session.refresh(sess)
+    await session.flush()
+    session.add(SessionSummary(session_id=sess.id))
+    await session.commit()
+    await session.refresh(sess)
     return sess
 
 @router.get("/sessions/me", response_model=List[SessionOut])
-def my_sessions(
-    session: Session = Depends(get_session),
+async def my_sessions(
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    return session.exec(
-        select(InterviewSession)
-        .where(InterviewSession.user_id == user.id)
-        .order_by(InterviewSession.started_at.desc())
-    ).all()
+    rows = await repository.user_sessions(session, user.id, page.limit, page.cursor)
+    return paginate(rows, page.limit, response, lambda s: (s.started_at, s.id))
 
 @router.post("/answer", response_model=AttemptOut)
-def submit_answer(
+async def submit_answer(
     body: AnswerIn,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
+    gc: GeminiClient = Depends(get_gemini_client),
 ):
     # Rate limit (AI call)
-    ensure_rate(user.id)
+    await aensure_rate(user.id)
 
-    # Validate session & ownership
-    sess = session.get(InterviewSession, body.session_id)
-    if not sess or sess.user_id != user.id:
-        raise HTTPException(404, "Session not found")
-    if sess.status != "active":
-        raise HTTPException(400, "Session is not active")
-
-    # Validate question in scenario
-    q = session.get(Question, body.question_id)
-    if not q or q.scenario_id != sess.scenario_id:
-        raise HTTPException(400, "Question does not belong to session's scenario")
+    q = await _answerable_question(session, body, user)
+    question_text = q.text
 
     # Create attempt
     attempt = Attempt(
-        session_id=sess.id,
+        session_id=body.session_id,
         user_id=user.id,
         question_id=q.id,
         user_answer=body.answer.strip(),
         ai_feedback=None,
         score=None,
+        status="pending",
     )
     session.add(attempt)
-    session.commit()
-    session.refresh(attempt)
+    await session.commit()
+    await session.refresh(attempt)
+    await release_connection(session)  # don't hold a pooled connection across the model call
 
     # Evaluate with Gemini
-    data = gc.evaluate_answer(q.text, body.answer.strip())
-    attempt.ai_feedback = json.dumps(data, ensure_ascii=False)
-    attempt.score = float(data.get("overall_score", 3.0))
-    session.add(attempt)
-    session.commit()
-    session.refresh(attempt)
+    data = await gc.aevaluate_answer(question_text, body.answer.strip())
+    await session.run_sync(record_evaluation, attempt, data)
+    await session.commit()
+    await session.refresh(attempt)
 
     return AttemptOut(**attempt.model_dump(), rubric=data.get("rubric"))
 
+@router.post("/answer/stream")
+async def submit_answer_stream(
+    body: AnswerIn,
+    session: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+    gc: GeminiClient = Depends(get_gemini_client),
+):
+    """Server-sent events: ``delta`` events carry feedback text as the model
+    generates it; a final ``result`` event carries the stored attempt with its
+    clamped rubric. The attempt is persisted once evaluation completes.
+    """
+    await aensure_rate(user.id)
+    q = await _answerable_question(session, body, user)
+    question_text, answer = q.text, body.answer.strip()
+    session_id, question_id, user_id = body.session_id, q.id, user.id
+
+    def persist(data: Dict[str, Any]) -> AttemptOut:
+        with Session(engine) as s:
+            attempt = Attempt(session_id=session_id, user_id=user_id, question_id=question_id, user_answer=answer)
+            record_evaluation(s, attempt, data)
+            s.commit()
+            s.refresh(attempt)
+            return AttemptOut(**attempt.model_dump(), rubric=data.get("rubric"))
+
+    async def stream():
+        async for kind, value in gc.astream_evaluation(question_text, answer):
+            if kind == "delta":
+                yield _sse("delta", json.dumps({"text": value}, ensure_ascii=False))
+            else:
+                out = await asyncio.to_thread(persist, value)
+                yield _sse("result", out.model_dump_json())
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@router.post("/answer/async", response_model=AttemptOut, status_code=status.HTTP_202_ACCEPTED)
+async def submit_answer_async(
+    body: AnswerIn,
+    session: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Persist the attempt as pending and evaluate it in the background queue.
+
+    Poll ``GET /interview/attempts/{id}`` or stream ``/attempts/{id}/events``
+    for the result.
+    """
+    await aensure_rate(user.id)
+    q = await _answerable_question(session, body, user)
+
+    attempt = Attempt(
+        session_id=body.session_id,
+        user_id=user.id,
+        question_id=q.id,
+        user_answer=body.answer.strip(),
+        status="pending",
+    )
+    session.add(attempt)
+    await session.flush()
+    evaluation_queue.enqueue(session, attempt)
+    await session.commit()
+    await session.refresh(attempt)
+    evaluation_queue.notify()
+
+    return AttemptOut(**attempt.model_dump())
+
 @router.get("/attempts/me", response_model=List[AttemptOut])
-def my_attempts(
+async def my_attempts(
+    response: Response,
     session_id: Optional[int] = None,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    stmt = (
-        select(Attempt)
-        .where(Attempt.user_id == user.id)
-        .order_by(Attempt.created_at.desc())
-    )
-    if session_id:
-        stmt = stmt.where(Attempt.session_id == session_id)
-    rows = session.exec(stmt).all()
-    return [AttemptOut(**a.model_dump(), rubric=_extract_rubric(a)) for a in rows]
+    rows = await repository.user_attempts(session, user.id, session_id, page.limit, page.cursor)
+    rows = paginate(rows, page.limit, response, lambda a: (a.created_at, a.id))
+    return [AttemptOut(**a.model_dump(), rubric=attempt_rubric(a)) for a in rows]
+
+@router.get("/attempts/{attempt_id}", response_model=AttemptOut)
+async def get_attempt(
+    attempt_id: int,
+    session: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    a = await session.get(Attempt, attempt_id)
+    if not a or a.user_id != user.id:
+        raise HTTPException(404, "Attempt not found")
+    return AttemptOut(**a.model_dump(), rubric=attempt_rubric(a))
+
+@router.get("/attempts/{attempt_id}/events")
+async def attempt_events(
+    attempt_id: int,
+    user: User = Depends(get_current_user),
+):
+    """Server-sent events: one ``status`` event per change until the attempt is scored or failed."""
+    def load() -> Optional[AttemptOut]:
+        with Session(engine) as s:
+            a = s.get(Attempt, attempt_id)
+            if not a or a.user_id != user.id:
+                return None
+            return AttemptOut(**a.model_dump(), rubric=attempt_rubric(a))
+
+    first = await asyncio.to_thread(load)
+    if first is None:
+        raise HTTPException(404, "Attempt not found")
+
+    async def stream():
+        current, last_status = first, None
+        for _ in range(SSE_MAX_POLLS):
+            if current.status != last_status:
+                last_status = current.status
+                yield _sse("status", current.model_dump_json())
+            if current.status in ("scored", "failed"):
+                return
+            await asyncio.sleep(SSE_POLL_SECONDS)
+            current = await asyncio.to_thread(load) or current
+            yield ": keep-alive\n\n"
+        yield _sse("timeout", "{}")
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @router.post("/sessions/{session_id}/complete", response_model=SessionOut)
-def complete_session(
+async def complete_session(
     session_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    sess = session.get(InterviewSession, session_id)
+    sess = await session.get(InterviewSession, session_id)
     if not sess or sess.user_id != user.id:
         raise HTTPException(404, "Session not found")
     sess.status = "completed"
     sess.ended_at = datetime.utcnow()
     session.add(sess)
-    session.commit()
-    session.refresh(sess)
+    await session.commit()
+    await session.refresh(sess)
     return sess
 
 @router.get("/sessions/{session_id}/summary", response_model=SessionSummaryOut)
-def session_summary(
+async def session_summary(
     session_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
+    gc: GeminiClient = Depends(get_gemini_client),
 ):
-    sess = session.get(InterviewSession, session_id)
+    sess = await session.get(InterviewSession, session_id)
     if not sess or sess.user_id != user.id:
         raise HTTPException(404, "Session not found")
 
-    atts = session.exec(
-        select(Attempt).where(Attempt.session_id == sess.id).order_by(Attempt.created_at.asc())
-    ).all()
-    if not atts:
+    stats = await session.get(SessionSummary, sess.id)
+    if not stats or not stats.scored_count:
         raise HTTPException(400, "No attempts in this session")
-
-    items = []
-    agg = {"relevance": 0.0, "star_structure": 0.0, "technical_depth": 0.0, "communication": 0.0}
-    n = 0
-    for a in atts:
-        q = session.get(Question, a.question_id)
-        rub = _extract_rubric(a) or {}
-        items.append({
-            "question": q.text if q else f"Q#{a.question_id}",
-            "answer": a.user_answer,
-            "overall_score": float(a.score or 0.0),
-            "rubric": rub,
-        })
-        if rub:
-            for k in agg:
-                agg[k] += float(rub.get(k, 0.0))
-            n += 1
-
-    avg = {k: (round(v / n, 2) if n else 0.0) for k, v in agg.items()}
-    report = gc.summarize_session(items)
+    avg = session_averages(stats)
+
+    # Reuse the stored summary unless new attempts were scored since it was computed
+    if stats.summary_json and stats.summary_version == stats.scored_count:
+        report = json.loads(stats.summary_json)
+    else:
+        version = stats.scored_count
+        items = []
+        for a, q in await repository.session_attempts_with_questions(session, sess.id, scored_only=True):
+            items.append({
+                "question": q.text if q else f"Q#{a.question_id}",
+                "answer": a.user_answer,
+                "feedback": attempt_feedback(a),  # sent instead of the answer when present
+                "overall_score": float(a.score or 0.0),
+                "rubric": attempt_rubric(a) or {},
+            })
+        await release_connection(session)
+        report = await gc.asummarize_session(items)
+        if not report.get("fallback"):
+            stats.summary_json = json.dumps(report, ensure_ascii=False)
+            stats.summary_version = version
+            stats.computed_at = datetime.utcnow()
+            session.add(stats)
+            await session.commit()
 
     return SessionSummaryOut(
     session_id=sess.id,
@@ -220,23 +336,17 @@ def session_summary(
 
 # --------- NEW: Session details (with questions) ---------
 @router.get("/sessions/{session_id}/details")
-def session_details(
+async def session_details(
     session_id: int,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    sess = db.get(InterviewSession, session_id)
+    sess, scenario, questions = await repository.session_with_questions(db, session_id)
     if not sess or sess.user_id != user.id:
         raise HTTPException(404, "Session not found")
-
-    scenario = db.get(InterviewScenario, sess.scenario_id)
     if not scenario:
         raise HTTPException(404, "Scenario not found")
 
-    questions = db.exec(
-        select(Question).where(Question.scenario_id == scenario.id)
-    ).all()
-
     return {
         "session": {
             "id": sess.id,
@@ -254,21 +364,15 @@ def session_details(
 
 # --------- NEW: Delete Session ---------
 @router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_session(
+async def delete_session(
     session_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    sess = session.get(InterviewSession, session_id)
+    sess = await session.get(InterviewSession, session_id)
     if not sess or sess.user_id != user.id:
         raise HTTPException(404, "Session not found")
 
-    # Delete attempts first (foreign key constraint)
-    attempts = session.exec(select(Attempt).where(Attempt.session_id == sess.id)).all()
-    for a in attempts:
-        session.delete(a)
-
-    # Delete the session
-    session.delete(sess)
-    session.commit()
+    await session.run_sync(lambda s: delete_sessions(s.connection(), [session_id]))
+    await session.commit()
     return None
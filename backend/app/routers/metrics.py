@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..database import pool_status
+from ..metrics import REGISTRY, gauge_lines
+
+router = APIRouter(tags=["metrics"])
+
+_POOL_GAUGES = {
+    "size": "Configured pool size.",
+    "checkedout": "Connections currently lent to requests or workers.",
+    "checkedin": "Idle connections held by the pool.",
+    "overflow": "Connections opened beyond the pool size (negative while below it).",
+}
+
+
+@REGISTRY.collector
+def _pool_metrics():
+    stats = pool_status()
+    for field, help in _POOL_GAUGES.items():
+        yield from gauge_lines(
+            f"db_pool_{field}", help,
+            (({"engine": name}, s[field]) for name, s in stats.items() if field in s),
+        )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..database import get_db
+from ..deps import get_read_user
+from ..models import User
+from .. import progress
+
+router = APIRouter(prefix="/me", tags=["progress"])
+
+@router.get("/progress")
+async def my_progress(session: AsyncSession = Depends(get_db), user: User = Depends(get_read_user)):
+    """Skill profile per scenario: attempt count, mean, recent (moving average) and trend for the
+    overall score and each rubric dimension, plus the same across all scenarios."""
+    return await progress.user_progress(session, user.id)
@@ -1,11 +1,13 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel, TypeAdapter
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..database import get_session         
-from ..deps import get_current_user, require_admin
+from ..catalogue import catalogue_cache
+from ..database import get_db
+from ..deps import get_read_user, require_admin
 from ..models import InterviewScenario, Question, User
 
 router = APIRouter(prefix="/scenarios", tags=["scenarios"])
@@ -30,36 +32,59 @@ class QuestionOut(BaseModel):
     class Config:
         from_attributes = True
 
+_scenario_list = TypeAdapter(List[ScenarioOut])
+_question_list = TypeAdapter(List[QuestionOut])
+
 # ---------- Endpoints ----------
+# Listings are served from catalogue_cache as pre-serialized JSON with an ETag;
+# a matching If-None-Match gets a 304 with no body and no catalogue query.
 @router.get("", response_model=List[ScenarioOut])
-def list_scenarios(
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_user),
+async def list_scenarios(
+    request: Request,
+    session: AsyncSession = Depends(get_db),
+    user: User = Depends(get_read_user),
 ):
-    return session.exec(select(InterviewScenario)).all()
+    async def load():
+        rows = (await session.exec(select(InterviewScenario).order_by(InterviewScenario.id))).all()
+        return _scenario_list.dump_json(_scenario_list.validate_python(rows, from_attributes=True))
+
+    return await catalogue_cache.respond(request, "scenarios", load)
 
 @router.get("/{scenario_id}/questions", response_model=List[QuestionOut])
-def list_questions(
+async def list_questions(
     scenario_id: int,
-    session: Session = Depends(get_session),
-    user: User = Depends(get_current_user),
+    request: Request,
+    session: AsyncSession = Depends(get_db),
+    user: User = Depends(get_read_user),
 ):
-    scenario = session.get(InterviewScenario, scenario_id)
-    if not scenario:
+    async def load():
+        # one query: the outer join yields (id, None) for a scenario without questions, nothing if it doesn't exist
+        rows = (await session.exec(
+            select(InterviewScenario.id, Question)
+            .join(Question, Question.scenario_id == InterviewScenario.id, isouter=True)
+            .where(InterviewScenario.id == scenario_id)
+            .order_by(Question.id)
+        )).all()
+        if not rows:
+            return None
+        questions = [q for _, q in rows if q is not None]
+        return _question_list.dump_json(_question_list.validate_python(questions, from_attributes=True))
+
+    response = await catalogue_cache.respond(request, ("questions", scenario_id), load)
+    if response is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scenario not found")
-    return session.exec(select(Question).where(Question.scenario_id == scenario_id)).all()
+    return response
 
 # Seed demo data (admin only)
 @router.post("/seed")
-def seed_scenarios(
-    session: Session = Depends(get_session),
+async def seed_scenarios(
+    session: AsyncSession = Depends(get_db),
     _: User = Depends(require_admin), 
 ):
     # idempotent-ish seed: if any scenarios exist, skip
-    exists = session.exec(select(InterviewScenario)).first()
-    if exists:
-        count = session.exec(select(InterviewScenario)).all()
-        return {"message": "Scenarios already seeded", "count": len(count)}
+    count = (await session.exec(select(func.count()).select_from(InterviewScenario))).one()
+    if count:
+        return {"message": "Scenarios already seeded", "count": count}
 
     s1 = InterviewScenario(
         title="Backend Engineer Interview",
@@ -75,9 +100,9 @@ def seed_scenarios(
     )
     session.add(s1)
     session.add(s2)
-    session.commit()
-    session.refresh(s1)
-    session.refresh(s2)
+    await session.commit()
+    await session.refresh(s1)
+    await session.refresh(s2)
 
     q = [
         Question(scenario_id=s1.id, text="Explain REST vs. GraphQL.", difficulty="medium"),
@@ -88,6 +113,7 @@ def seed_scenarios(
         Question(scenario_id=s2.id, text="Explain hydration in SSR frameworks.", difficulty="hard"),
     ]
     session.add_all(q)
-    session.commit()
+    await session.commit()
+    catalogue_cache.invalidate()
 
     return {"message": "Seeded demo scenarios & questions", "scenario_ids": [s1.id, s2.id]}
@@ -0,0 +1,76 @@
+from typing import Dict, Any, Optional
+import json
+
+from sqlmodel import Session
+
+from .ai_service import RUBRIC_KEYS
+from .analytics import record_score
+from .models import Attempt, Question, SessionSummary
+from .progress import record_progress
+
+
+def record_evaluation(session: Session, attempt: Attempt, data: Dict[str, Any]) -> Attempt:
+    """Store a model evaluation on ``attempt`` and fold it into the session totals,
+    the analytics rollups and the user's skill profile.
+
+    Everything is added to the caller's transaction; the caller commits.
+    A fallback result (the model could not be reached or parsed) marks the
+    attempt ``failed`` and is kept out of every score.
+    """
+    attempt.ai_feedback = json.dumps(data, ensure_ascii=False)
+    if data.get("fallback"):
+        attempt.score = None
+        attempt.status = "failed"
+        session.add(attempt)
+        return attempt
+    attempt.score = float(data.get("overall_score", 3.0))
+    attempt.status = "scored"
+    rubric = data.get("rubric")
+    if isinstance(rubric, dict):
+        for k in RUBRIC_KEYS:
+            setattr(attempt, k, float(rubric.get(k, 0.0)))
+    session.add(attempt)
+    _add_to_session_summary(session, attempt.session_id, attempt.score, rubric)
+    question = session.get(Question, attempt.question_id)
+    if question is not None:
+        record_score(session, attempt, question.scenario_id, rubric)
+        record_progress(session, attempt, question.scenario_id, rubric)
+    return attempt
+
+
+def _add_to_session_summary(session: Session, session_id: int, score: float, rubric):
+    stats = session.get(SessionSummary, session_id)
+    if stats is None:
+        stats = SessionSummary(session_id=session_id)
+        session.add(stats)
+        session.flush()
+    # Column expressions become "col = col + x" so concurrent workers don't lose updates.
+    stats.scored_count = SessionSummary.scored_count + 1
+    stats.score_sum = SessionSummary.score_sum + score
+    if isinstance(rubric, dict):
+        stats.rubric_count = SessionSummary.rubric_count + 1
+        for k in RUBRIC_KEYS:
+            col = f"{k}_sum"
+            setattr(stats, col, getattr(SessionSummary, col) + float(rubric.get(k, 0.0)))
+    session.add(stats)
+
+
+def session_averages(stats: SessionSummary) -> Dict[str, float]:
+    n = stats.rubric_count
+    return {k: (round(getattr(stats, f"{k}_sum") / n, 2) if n else 0.0) for k in RUBRIC_KEYS}
+
+
+def attempt_rubric(attempt: Attempt) -> Optional[Dict[str, float]]:
+    if attempt.relevance is None:
+        return None
+    return {k: float(getattr(attempt, k) or 0.0) for k in RUBRIC_KEYS}
+
+
+def attempt_feedback(attempt: Attempt) -> Optional[str]:
+    """Feedback text from the stored evaluation, or None (pending, failed or unparsable)."""
+    if not attempt.ai_feedback or attempt.status != "scored":
+        return None
+    try:
+        return json.loads(attempt.ai_feedback).get("feedback") or None
+    except (ValueError, AttributeError):
+        return None
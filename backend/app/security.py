@@ -1,6 +1,10 @@
 import os
+import asyncio, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+from fastapi import HTTPException
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
@@ -8,7 +12,15 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(8 * max(1, PASSWORD_HASH_WORKERS))))
+
+# Hashes below the configured cost are reported by needs_update and rehashed on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS, bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -16,6 +28,67 @@ def get_password_hash(password: str) -> str:
 def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
+def verify_and_update_password(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """Return (valid, new_hash); ``new_hash`` is set when the stored cost is outdated."""
+    return pwd_context.verify_and_update(password, password_hash)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated, size-capped process pool.
+
+    bcrypt holds the GIL for the whole hash, so doing it inline stalls every
+    other request on the worker. At most ``max_pending`` calls may be queued
+    or running; beyond that callers get a 503 with Retry-After instead of
+    piling up. ``workers=0`` runs hashes on the default thread pool instead.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+        self._pending += 1
+        try:
+            pool = self._pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                # A worker died (OOM kill, signal): replace the pool once instead of failing every later call.
+                self._discard(pool)
+                return await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    def _discard(self, pool: Optional[ProcessPoolExecutor]):
+        if pool is not None and self._executor is pool:  # concurrent callers replace it only once
+            pool.shutdown(wait=False)
+            self._executor = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, password, password_hash)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
 # def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -> str:
 #     to_encode = data.copy()
 #     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
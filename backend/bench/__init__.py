@@ -0,0 +1,6 @@
+"""Load-testing harness: the real app under uvicorn with a local Gemini stand-in.
+
+    python -m bench.run --users 20 --concurrency 10 --answers 5 --out bench.json
+
+See ``backend/README.md`` ("Benchmarks") for the options and report format.
+"""
@@ -0,0 +1,107 @@
+"""Drop-in replacement for ``google.generativeai.GenerativeModel``.
+
+Answers evaluation, batch-evaluation and summary prompts with well-formed JSON
+after a simulated latency, and fails or returns malformed output at the
+configured rates. Configured from ``BENCH_MODEL_*`` environment variables so
+the server process picks up what ``bench.run`` was given.
+"""
+from dataclasses import dataclass
+import asyncio, json, os, random, re, time
+
+import google.generativeai as genai
+from google.api_core import exceptions as gexc
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    stream_chunk_chars: int = 16
+
+    @classmethod
+    def from_env(cls) -> "FakeConfig":
+        return cls(
+            latency_ms=float(os.getenv("BENCH_MODEL_LATENCY_MS", cls.latency_ms)),
+            jitter_ms=float(os.getenv("BENCH_MODEL_JITTER_MS", cls.jitter_ms)),
+            error_rate=float(os.getenv("BENCH_MODEL_ERROR_RATE", cls.error_rate)),
+            malformed_rate=float(os.getenv("BENCH_MODEL_MALFORMED_RATE", cls.malformed_rate)),
+        )
+
+    def to_env(self) -> dict:
+        return {
+            "BENCH_MODEL_LATENCY_MS": str(self.latency_ms),
+            "BENCH_MODEL_JITTER_MS": str(self.jitter_ms),
+            "BENCH_MODEL_ERROR_RATE": str(self.error_rate),
+            "BENCH_MODEL_MALFORMED_RATE": str(self.malformed_rate),
+        }
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def _evaluation(rng: random.Random) -> dict:
+    rubric = {k: rng.randint(1, 5) for k in ("relevance", "star_structure", "technical_depth", "communication")}
+    return {
+        "feedback": "Clear structure; add a concrete example and the measurable outcome.",
+        "overall_score": round(sum(rubric.values()) / 4, 1),
+        "rubric": rubric,
+    }
+
+
+def _reply(prompt: str, rng: random.Random) -> str:
+    if "Summarize this session" in prompt:
+        return json.dumps({"summary": "Solid fundamentals.", "strengths": ["structure"], "improvements": ["depth"]})
+    if "Items:" in prompt:
+        ids = re.findall(r'"id":\s*(\d+)', prompt)
+        return json.dumps({"results": [{"id": int(i), **_evaluation(rng)} for i in ids]})
+    return json.dumps(_evaluation(rng))
+
+
+class FakeModel:
+    config = FakeConfig.from_env()
+    _rng = random.Random(int(os.getenv("BENCH_SEED", "0")))
+
+    def __init__(self, model_name: str = "", *args, **kwargs):
+        self.model_name = model_name
+
+    def _delay(self) -> float:
+        c = self.config
+        return max(0.0, c.latency_ms + self._rng.uniform(-c.jitter_ms, c.jitter_ms)) / 1000
+
+    def _outcome(self, prompt: str) -> str:
+        roll = self._rng.random()
+        if roll < self.config.error_rate:
+            raise gexc.ServiceUnavailable("fake model: simulated outage")
+        if roll < self.config.error_rate + self.config.malformed_rate:
+            return "Sure! Here is the evaluation: {\"feedback\": \"unterminated"
+        return _reply(prompt, self._rng)
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self._delay())
+        return _Response(self._outcome(prompt))
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        delay = self._delay()
+        if not stream:
+            await asyncio.sleep(delay)
+            return _Response(self._outcome(prompt))
+
+        text = self._outcome(prompt)
+        size = self.config.stream_chunk_chars
+        chunks = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+        async def gen():
+            for chunk in chunks:
+                await asyncio.sleep(delay / len(chunks))
+                yield _Response(chunk)
+
+        return gen()
+
+
+def install():
+    """Route every ``GenerativeModel`` created after this call to the stand-in."""
+    genai.GenerativeModel = FakeModel
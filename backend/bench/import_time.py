@@ -0,0 +1,90 @@
+"""Measure how long ``import app.main`` takes in a fresh interpreter.
+
+    python -m bench.import_time --runs 5 --out import.json [--baseline import.json]
+
+Each run is a new process (nothing cached in ``sys.modules``). The JSON report
+has the wall-clock median/min/max, the slowest modules by cumulative import
+time (from ``python -X importtime``) and whether any model SDK was imported,
+which should stay false: the SDK is loaded on the first model call.
+"""
+from typing import Dict, List
+import argparse, json, os, statistics, subprocess, sys
+
+TARGET = "app.main"
+SDK_MODULES = ("google.generativeai", "google.genai", "grpc")
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed, "sdk": [m for m in {sdk!r} if m in sys.modules]}}))
+"""
+
+
+def _run_once(backend_dir: str) -> Dict:
+    code = _PROBE.format(target=TARGET, sdk=SDK_MODULES)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", code],
+        cwd=backend_dir, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    modules = {}
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, _self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        modules[name] = int(cumulative_us)
+    result["modules"] = modules
+    return result
+
+
+def measure(runs: int, top: int) -> Dict:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples: List[Dict] = [_run_once(backend_dir) for _ in range(runs)]
+    seconds = [s["seconds"] for s in samples]
+    slowest = sorted(samples[-1]["modules"].items(), key=lambda kv: kv[1], reverse=True)
+    return {
+        "target": TARGET,
+        "runs": runs,
+        "median_ms": round(statistics.median(seconds) * 1000, 1),
+        "min_ms": round(min(seconds) * 1000, 1),
+        "max_ms": round(max(seconds) * 1000, 1),
+        "sdk_imported": sorted({m for s in samples for m in s["sdk"]}),
+        "slowest_modules_ms": {name: round(us / 1000, 1) for name, us in slowest[:top]},
+    }
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    p.add_argument("--out", help="write the JSON report here (default: stdout)")
+    p.add_argument("--baseline", help="earlier report to compare against")
+    p.add_argument("--tolerance", type=float, default=0.2, help="allowed median growth vs. baseline")
+    args = p.parse_args(argv)
+
+    report = measure(args.runs, args.top)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    problems = []
+    if report["sdk_imported"]:
+        problems.append(f"model SDK imported at startup: {', '.join(report['sdk_imported'])}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            old = json.load(f)
+        if report["median_ms"] > old["median_ms"] * (1 + args.tolerance):
+            problems.append(f"median import {old['median_ms']}ms -> {report['median_ms']}ms")
+    for line in problems:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""Drive register → login → start session → answer ×N → summary flows and report latency.
+
+Starts ``bench.server`` on a throwaway SQLite database (or ``--db-url``), seeds
+it as admin, runs ``--users`` flows with at most ``--concurrency`` in flight,
+and writes a JSON report: per-endpoint count, errors, p50/p95/p99/mean latency,
+throughput and SQL statements per request. ``--baseline`` compares against an
+earlier report and exits 1 when an endpoint regressed beyond ``--tolerance``.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+import argparse, asyncio, json, os, subprocess, sys, tempfile, time, uuid
+
+import httpx
+
+from .fake_gemini import FakeConfig
+
+ADMIN_EMAIL = "bench-admin@example.com"
+PASSWORD = "bench-pass-123"
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = max(0, min(len(ordered) - 1, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[idx]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            self.latencies[label].append(time.perf_counter() - start)
+            raise
+        self.latencies[label].append(time.perf_counter() - start)
+        if resp.status_code >= 400:
+            self.errors[label] += 1
+        return resp
+
+    async def stream(self, client: httpx.AsyncClient, label: str, url: str, **kwargs) -> Optional[float]:
+        """POST an SSE endpoint; records time to the last byte, returns time to the first delta."""
+        start = time.perf_counter()
+        first = None
+        async with client.stream("POST", url, **kwargs) as resp:
+            async for line in resp.aiter_lines():
+                if first is None and line.startswith("event: delta"):
+                    first = time.perf_counter() - start
+        self.latencies[label].append(time.perf_counter() - start)
+        if resp.status_code >= 400:
+            self.errors[label] += 1
+        return first
+
+
+async def _login(rec: Recorder, client: httpx.AsyncClient, email: str) -> Dict[str, str]:
+    resp = await rec.call(client, "POST /auth/login", "POST", "/auth/login", json={"email": email, "password": PASSWORD})
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+async def user_flow(rec: Recorder, client: httpx.AsyncClient, args, ttfb: List[float]):
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    await rec.call(client, "POST /auth/register", "POST", "/auth/register",
+                   json={"name": "Bench User", "email": email, "password": PASSWORD})
+    headers = await _login(rec, client, email)
+
+    scenarios = (await rec.call(client, "GET /scenarios", "GET", "/scenarios", headers=headers)).json()
+    scenario_id = scenarios[0]["id"]
+    questions = (await rec.call(client, "GET /scenarios/{scenario_id}/questions", "GET",
+                                f"/scenarios/{scenario_id}/questions", headers=headers)).json()
+    sess = (await rec.call(client, "POST /interview/sessions/start", "POST", "/interview/sessions/start",
+                           json={"scenario_id": scenario_id}, headers=headers)).json()
+
+    for i in range(args.answers):
+        body = {"session_id": sess["id"], "question_id": questions[i % len(questions)]["id"],
+                "answer": f"Answer {i}: I would start by clarifying requirements, then {uuid.uuid4().hex}."}
+        if args.mode == "stream":
+            first = await rec.stream(client, "POST /interview/answer/stream", "/interview/answer/stream",
+                                     json=body, headers=headers)
+            if first is not None:
+                ttfb.append(first)
+        elif args.mode == "queue":
+            attempt = (await rec.call(client, "POST /interview/answer/async", "POST", "/interview/answer/async",
+                                      json=body, headers=headers)).json()
+            for _ in range(int(args.poll_timeout / args.poll_interval)):
+                got = await rec.call(client, "GET /interview/attempts/{attempt_id}", "GET",
+                                     f"/interview/attempts/{attempt['id']}", headers=headers)
+                if got.json().get("status") != "pending":
+                    break
+                await asyncio.sleep(args.poll_interval)
+        else:
+            await rec.call(client, "POST /interview/answer", "POST", "/interview/answer", json=body, headers=headers)
+
+    await rec.call(client, "GET /interview/sessions/{session_id}/summary", "GET",
+                   f"/interview/sessions/{sess['id']}/summary", headers=headers)
+    await rec.call(client, "GET /interview/attempts/me", "GET", "/interview/attempts/me", headers=headers)
+
+
+async def drive(args, base_url: str) -> dict:
+    rec = Recorder()
+    ttfb: List[float] = []
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await client.post("/auth/register", json={"name": "Bench Admin", "email": ADMIN_EMAIL, "password": PASSWORD})
+        admin = await _login(rec, client, ADMIN_EMAIL)
+        await client.post("/scenarios/seed", headers=admin)
+        await client.post("/__bench/reset")
+        rec.latencies.clear()
+
+        slots = asyncio.Semaphore(args.concurrency)
+        failed_flows = 0
+
+        async def one():
+            nonlocal failed_flows
+            async with slots:
+                try:
+                    await user_flow(rec, client, args, ttfb)
+                except (httpx.HTTPError, KeyError, IndexError, ValueError):
+                    failed_flows += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.users)))
+        elapsed = time.perf_counter() - start
+        server_stats = (await client.get("/__bench/stats")).json()
+
+    endpoints = {}
+    for label, values in sorted(rec.latencies.items()):
+        served = server_stats.get(label, {})
+        endpoints[label] = {
+            "count": len(values),
+            "errors": rec.errors.get(label, 0),
+            "p50_ms": _ms(percentile(values, 0.50)),
+            "p95_ms": _ms(percentile(values, 0.95)),
+            "p99_ms": _ms(percentile(values, 0.99)),
+            "mean_ms": _ms(sum(values) / len(values)),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "db_queries_per_request": (round(served["queries"] / served["requests"], 2)
+                                       if served.get("requests") else None),
+        }
+    total = sum(len(v) for v in rec.latencies.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "flows": args.users,
+        "failed_flows": failed_flows,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "stream_first_delta_p50_ms": _ms(percentile(ttfb, 0.50)),
+        "endpoints": endpoints,
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Endpoints whose p95 latency or queries per request grew beyond ``tolerance``."""
+    problems = []
+    for label, old in baseline.get("endpoints", {}).items():
+        new = report["endpoints"].get(label)
+        if not new:
+            continue
+        if old.get("p95_ms") and new["p95_ms"] and new["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            problems.append(f"{label}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms")
+        oq, nq = old.get("db_queries_per_request"), new.get("db_queries_per_request")
+        if oq is not None and nq is not None and nq > oq:
+            problems.append(f"{label}: queries/request {oq} -> {nq}")
+    return problems
+
+
+async def _wait_ready(base_url: str, proc: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError("bench server exited during startup")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("bench server did not become ready")
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--users", type=int, default=20, help="flows to run")
+    p.add_argument("--concurrency", type=int, default=10, help="flows in flight at once")
+    p.add_argument("--answers", type=int, default=5, help="answers per flow")
+    p.add_argument("--mode", choices=("sync", "stream", "queue"), default="sync",
+                   help="answer via /answer, /answer/stream or /answer/async + polling")
+    p.add_argument("--latency-ms", type=float, default=FakeConfig.latency_ms)
+    p.add_argument("--jitter-ms", type=float, default=FakeConfig.jitter_ms)
+    p.add_argument("--error-rate", type=float, default=FakeConfig.error_rate)
+    p.add_argument("--malformed-rate", type=float, default=FakeConfig.malformed_rate)
+    p.add_argument("--db-url", help="defaults to a fresh SQLite file")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--timeout", type=float, default=60.0, help="per-request timeout (s)")
+    p.add_argument("--poll-interval", type=float, default=0.2)
+    p.add_argument("--poll-timeout", type=float, default=60.0)
+    p.add_argument("--out", help="write the JSON report here (default: stdout)")
+    p.add_argument("--baseline", help="earlier report to compare against")
+    p.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth vs. baseline")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    fake = FakeConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.malformed_rate)
+    db_url = args.db_url or f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.db"
+    env = {
+        **os.environ,
+        **fake.to_env(),
+        "DB_URL": db_url,
+        "ADMIN_EMAIL": ADMIN_EMAIL,
+        "RATE_LIMIT_AI": os.getenv("RATE_LIMIT_AI", "1000000/1"),
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "bench"),
+    }
+    base_url = f"http://127.0.0.1:{args.port}"
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen([sys.executable, "-m", "bench.server", "--port", str(args.port)], cwd=backend_dir, env=env)
+    try:
+        asyncio.run(_wait_ready(base_url, proc))
+        report = asyncio.run(drive(args, base_url))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=15)
+
+    report["config"] = {
+        "users": args.users, "concurrency": args.concurrency, "answers": args.answers, "mode": args.mode,
+        "db": db_url.split(":", 1)[0], "model": vars(fake),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        for line in problems:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
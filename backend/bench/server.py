@@ -0,0 +1,84 @@
+"""Boot the app under uvicorn with the fake model and per-route query counting.
+
+    python -m bench.server --port 8765
+
+Adds ``GET /__bench/stats`` (requests and SQL statements per route template)
+and ``POST /__bench/reset``. Only for benchmarking; never mount in production.
+"""
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+import argparse, os, threading
+
+_queries: ContextVar[Optional[List[int]]] = ContextVar("bench_queries", default=None)
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _count_statement(*_):
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class QueryCountMiddleware:
+    """Pure ASGI so statements issued while a streaming body is sent are counted too."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/__bench"):
+            return await self.app(scope, receive, send)
+        counter = [0]
+        token = _queries.set(counter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _queries.reset(token)
+            route = scope.get("route")
+            key = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+            with _lock:
+                entry = _stats.setdefault(key, {"requests": 0, "queries": 0})
+                entry["requests"] += 1
+                entry["queries"] += counter[0]
+
+
+def build_app():
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    from . import fake_gemini
+    fake_gemini.install()
+
+    from sqlalchemy import event
+    from app.database import engine, async_engine
+    from app.main import app
+
+    for eng in filter(None, (engine, getattr(async_engine, "sync_engine", None))):
+        event.listen(eng, "before_cursor_execute", _count_statement)
+
+    @app.get("/__bench/stats", include_in_schema=False)
+    def bench_stats():
+        with _lock:
+            return {k: dict(v) for k, v in _stats.items()}
+
+    @app.post("/__bench/reset", include_in_schema=False)
+    def bench_reset():
+        with _lock:
+            _stats.clear()
+        return {"ok": True}
+
+    app.add_middleware(QueryCountMiddleware)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(build_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
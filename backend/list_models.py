@@ -1,8 +1,8 @@
-from google import genai
+import google.generativeai as genai
 from app.config import GEMINI_API_KEY
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+genai.configure(api_key=GEMINI_API_KEY)
 
 print("Available models for your key:\n")
-for m in client.models.list():
+for m in genai.list_models():
     print("-", m.name)
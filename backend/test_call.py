@@ -1,11 +1,10 @@
-from google import genai
+import google.generativeai as genai
 from app.config import GEMINI_API_KEY
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+genai.configure(api_key=GEMINI_API_KEY)
 
 print("Trying Gemini 1.5 Flash (new endpoint)...")
-resp = client.models.generate_content(
-    model="models/gemini-1.5-flash",
-    contents="Say hello in one short sentence."
+resp = genai.GenerativeModel("models/gemini-1.5-flash").generate_content(
+    "Say hello in one short sentence."
 )
 print(resp.text)
@@ -0,0 +1,146 @@
+"""SQL statements per request for the admin listings, a user's attempts and
+the session details and summary.
+
+Each endpoint must issue a fixed number of statements, however many rows it
+returns (no per-row lookups). Statements are counted with a
+``before_cursor_execute`` listener on the engines the request sessions use.
+"""
+import os, tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="query-counts-")
+os.environ["DB_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ["ADMIN_EMAIL"] = "admin@example.com"
+os.environ["EVAL_QUEUE_WORKERS"] = "0"  # no background polling while counting
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.ai_service import get_gemini_client
+from app.database import async_engine, engine
+from app.main import app
+from app.models import Attempt, Question
+from app.scoring import record_evaluation
+
+PASSWORD = "secret-pass"
+_statements = [0]
+
+
+def _count(*_):
+    _statements[0] += 1
+
+
+for _eng in filter(None, (engine, getattr(async_engine, "sync_engine", None))):
+    event.listen(_eng, "before_cursor_execute", _count)
+
+
+def _statements_for(client, url, headers, warm_url=None) -> int:
+    client.get(warm_url or url, headers=headers).raise_for_status()  # warms the principal cache
+    _statements[0] = 0
+    client.get(url, headers=headers).raise_for_status()
+    return _statements[0]
+
+
+def _add_attempts(session_id: int, user_id: int, n: int):
+    with Session(engine) as db:
+        questions = db.exec(select(Question)).all()
+        for i in range(n):
+            q = questions[i % len(questions)]
+            db.add(Attempt(session_id=session_id, user_id=user_id, question_id=q.id,
+                           user_answer=f"answer {i}", score=3.0, status="scored"))
+        db.commit()
+
+
+def _add_scored(session_id: int, user_id: int, n: int):
+    """Attempts that went through evaluation, so the session summary counts them."""
+    with Session(engine) as db:
+        questions = db.exec(select(Question)).all()
+        for i in range(n):
+            q = questions[i % len(questions)]
+            attempt = Attempt(session_id=session_id, user_id=user_id, question_id=q.id,
+                              user_answer=f"scored answer {i}", status="pending")
+            db.add(attempt)
+            db.flush()
+            rubric = {"relevance": 4, "star_structure": 3, "technical_depth": 4, "communication": 5}
+            record_evaluation(db, attempt, {"feedback": "ok", "overall_score": 4.0, "rubric": rubric})
+            db.commit()
+
+
+class _FakeClient:
+    async def asummarize_session(self, items):
+        return {"summary": f"{len(items)} answers", "strengths": [], "improvements": []}
+
+
+@pytest.fixture(scope="module")
+def ctx():
+    with TestClient(app) as client:
+        client.post("/auth/register", json={"name": "Admin", "email": "admin@example.com", "password": PASSWORD})
+        token = client.post("/auth/login", json={"email": "admin@example.com", "password": PASSWORD}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        client.post("/scenarios/seed", headers=headers).raise_for_status()
+        scenario_id = client.get("/scenarios", headers=headers).json()[0]["id"]
+        for i in range(3):
+            client.post("/auth/register", json={"name": f"U{i}", "email": f"u{i}@example.com", "password": PASSWORD})
+        sess = client.post("/interview/sessions/start", json={"scenario_id": scenario_id}, headers=headers).json()
+        me = client.get("/auth/me", headers=headers).json()
+        _add_attempts(sess["id"], me["id"], 2)
+        app.dependency_overrides[get_gemini_client] = _FakeClient
+        yield client, headers, sess["id"], me["id"]
+        app.dependency_overrides.pop(get_gemini_client, None)
+
+
+EXPECTED = {
+    "/admin/users": 1,
+    "/admin/users/{user_id}/sessions": 1,
+    "/admin/sessions/{session_id}/attempts": 1,
+    "/interview/sessions/{session_id}/details": 2,
+}
+# session and its summary row, attempts with questions, storing the new summary
+EXPECTED_SUMMARY = 4
+
+
+@pytest.mark.parametrize("route", sorted(EXPECTED))
+def test_statement_count_is_fixed(ctx, route):
+    client, headers, session_id, user_id = ctx
+    url = route.format(session_id=session_id, user_id=user_id)
+    before = _statements_for(client, url, headers)
+    assert before == EXPECTED[route]
+
+    # more rows must not mean more statements
+    _add_attempts(session_id, user_id, 5)
+    client.post("/auth/register", json={"name": "Extra", "email": f"extra-{route}@example.com", "password": PASSWORD})
+    assert _statements_for(client, url, headers) == before
+
+
+def _new_user_session(client, name: str):
+    email = f"{name}@example.com"
+    client.post("/auth/register", json={"name": name, "email": email, "password": PASSWORD}).raise_for_status()
+    token = client.post("/auth/login", json={"email": email, "password": PASSWORD}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    scenario_id = client.get("/scenarios", headers=headers).json()[0]["id"]
+    sess = client.post("/interview/sessions/start", json={"scenario_id": scenario_id}, headers=headers).json()
+    return headers, sess["id"], client.get("/auth/me", headers=headers).json()["id"]
+
+
+def test_my_attempts_statement_count(ctx):
+    client = ctx[0]
+    headers, session_id, user_id = _new_user_session(client, "attempts-owner")
+    _add_scored(session_id, user_id, 1)
+    assert _statements_for(client, "/interview/attempts/me", headers) == 1
+    _add_scored(session_id, user_id, 9)
+    assert _statements_for(client, "/interview/attempts/me", headers) == 1
+
+
+def test_summary_statement_count(ctx):
+    """The summary is rebuilt after new scored attempts; building it must not query per attempt."""
+    client = ctx[0]
+    headers, session_id, user_id = _new_user_session(client, "summary-owner")
+    url = f"/interview/sessions/{session_id}/summary"
+    counts = []
+    for n in (1, 9):
+        _add_scored(session_id, user_id, n)  # makes the stored summary stale
+        counts.append(_statements_for(client, url, headers, warm_url="/auth/me"))
+        assert client.get(url, headers=headers).json()["summary"] == f"{1 if n == 1 else 10} answers"
+    assert counts == [EXPECTED_SUMMARY, EXPECTED_SUMMARY]
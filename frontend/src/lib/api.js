@@ -19,3 +19,9 @@ api.interceptors.request.use((config) => {
 export function asError(e) {
   return e?.response?.data?.detail || e.message
 }
+
+// List endpoints return one page at a time; the cursor for the next page
+// (null on the last one) comes back in the X-Next-Cursor header.
+export function nextCursor(res) {
+  return res.headers['x-next-cursor'] || null
+}